@@ -8,6 +8,7 @@ for analytics and monitoring purposes with robust error handling.
 import asyncio
 import json
 import logging
+import orjson
 import os
 import time
 from datetime import datetime, timezone
@@ -125,12 +126,19 @@ class FirebaseLogger:
         
         return sanitized
 
-    def _prepare_log_entry(self, 
+    def _prepare_log_entry(self,
                           request_payload: Dict[str, Any],
                           response_data: Dict[str, Any],
                           metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Prepare log entry for Firebase"""
-        
+
+        # Callers may hand us raw request/response bytes so parsing happens
+        # here, off the proxy's request path
+        if isinstance(request_payload, (bytes, bytearray)):
+            request_payload = orjson.loads(request_payload)
+        if isinstance(response_data, (bytes, bytearray)):
+            response_data = orjson.loads(response_data)
+
         # Generate unique request ID
         request_id = str(uuid.uuid4())
         timestamp = datetime.now(timezone.utc)
@@ -183,6 +191,30 @@ class FirebaseLogger:
         
         return log_entry
 
+    def _prepare_error_entry(self,
+                             request_payload: Dict[str, Any],
+                             error_details: Dict[str, Any],
+                             metadata: Optional[Dict[str, Any]]) -> tuple:
+        """Convert error-log arguments into the standard (request, response, metadata) form"""
+        if metadata is None:
+            metadata = {}
+
+        # Accept raw request bytes, same as log_request_response
+        if isinstance(request_payload, (bytes, bytearray)):
+            request_payload = orjson.loads(request_payload)
+
+        metadata['error'] = error_details
+        metadata['status_code'] = error_details.get('status_code', 500)
+
+        # Create error response format
+        error_response = {
+            'error': error_details,
+            'model': request_payload.get('model'),
+            'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+        }
+
+        return request_payload, error_response, metadata
+
     def _write_to_firebase_with_retry(self, log_entry: Dict[str, Any]):
         """Synchronous Firebase write operation with retry logic"""
         for attempt in range(self.retry_attempts):
@@ -250,6 +282,78 @@ class FirebaseLogger:
             logger.error(f"Error in async Firebase logging: {e}")
             self._record_error()
 
+    def _write_batch_to_firebase_with_retry(self, log_entries: list):
+        """Synchronous batched Firebase write with retry logic"""
+        for attempt in range(self.retry_attempts):
+            try:
+                if not self.initialized or not self.db:
+                    logger.warning("Firebase not initialized, skipping log batch")
+                    return
+
+                # One WriteBatch commit covers every entry - a single RPC
+                # instead of one round-trip per logged request
+                collection_name = f"proxy_logs_{datetime.now().strftime('%Y_%m_%d')}"  # Daily collections
+                batch = self.db.batch()
+                for log_entry in log_entries:
+                    doc_ref = self.db.collection(collection_name).document(log_entry['request_id'])
+                    batch.set(doc_ref, log_entry)
+                batch.commit()
+
+                logger.debug(f"Successfully logged batch of {len(log_entries)} entries to Firebase (attempt {attempt + 1})")
+                self._record_success()
+                return
+
+            except Exception as e:
+                logger.warning(f"Firebase batch write attempt {attempt + 1}/{self.retry_attempts} failed: {e}")
+                if attempt == self.retry_attempts - 1:
+                    logger.error(f"Failed to write batch to Firebase after {self.retry_attempts} attempts: {e}")
+                    self._record_error()
+                else:
+                    # Wait before retry with exponential backoff
+                    wait_time = (2 ** attempt) * 0.5  # 0.5s, 1s, 2s
+                    time.sleep(wait_time)
+
+    async def log_batch(self, entries: list) -> None:
+        """
+        Log several entries to Firebase in one batched write
+
+        Args:
+            entries: List of (kind, args) tuples where kind is 'response' or
+                     'error' and args matches the corresponding log_* method
+        """
+        if not self._should_log():
+            return
+
+        log_entries = []
+        for kind, args in entries:
+            try:
+                if kind == 'error':
+                    request_payload, response_data, metadata = self._prepare_error_entry(*args)
+                else:
+                    request_payload, response_data, metadata = args
+                    if metadata is None:
+                        metadata = {}
+                log_entries.append(self._prepare_log_entry(request_payload, response_data, metadata))
+            except Exception as e:
+                logger.error(f"Error preparing batched log entry: {e}")
+
+        if not log_entries:
+            return
+
+        try:
+            loop = asyncio.get_event_loop()
+            await asyncio.wait_for(
+                loop.run_in_executor(self.executor, self._write_batch_to_firebase_with_retry, log_entries),
+                timeout=self.connection_timeout
+            )
+
+        except asyncio.TimeoutError:
+            logger.warning(f"Firebase batch logging timed out after {self.connection_timeout}s")
+            self._record_error()
+        except Exception as e:
+            logger.error(f"Error in async Firebase batch logging: {e}")
+            self._record_error()
+
     async def log_error(self,
                        request_payload: Dict[str, Any],
                        error_details: Dict[str, Any],
@@ -266,21 +370,11 @@ class FirebaseLogger:
             return
             
         try:
-            if metadata is None:
-                metadata = {}
-                
-            metadata['error'] = error_details
-            metadata['status_code'] = error_details.get('status_code', 500)
-            
-            # Create error response format
-            error_response = {
-                'error': error_details,
-                'model': request_payload.get('model'),
-                'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
-            }
-            
+            request_payload, error_response, metadata = self._prepare_error_entry(
+                request_payload, error_details, metadata
+            )
             await self.log_request_response(request_payload, error_response, metadata)
-            
+
         except Exception as e:
             logger.error(f"Error logging Firebase error: {e}")
 
@@ -1,14 +1,22 @@
 from fastapi import FastAPI, HTTPException, Request, Response
-from fastapi.responses import StreamingResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import hashlib
 import httpx
 import os
+import sys
 import json
 import logging
-import uuid
 import re
 import time
 import asyncio
-from typing import Dict, Any, AsyncGenerator, List, Optional
+import functools
+import itertools
+import secrets
+import orjson
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Dict, Any, AsyncGenerator, Final, Iterator, List, Optional, Union
+import msgspec
 from dotenv import load_dotenv
 
 # Load environment variables from .env.local file FIRST
@@ -21,19 +29,198 @@ from firebase_logger import firebase_logger
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Shared upstream HTTP client, created for the app's lifetime. Reusing one
+# pooled client avoids rebuilding the connection pool, TLS session, and DNS
+# cache on every proxied request.
+_upstream_client: Optional[httpx.AsyncClient] = None
+
+# Firebase log entries go through a bounded queue drained by a single worker
+# task. Compared to one asyncio task per request this adds back-pressure (a
+# Firebase outage drops logs instead of accumulating tasks without bound) and
+# keeps per-request overhead to a put_nowait.
+LOG_QUEUE_MAXSIZE: Final = 10_000
+LOG_BATCH_SIZE: Final = 50
+LOG_BATCH_WINDOW: Final = 0.05  # seconds to wait for more entries before flushing
+_log_queue: Optional[asyncio.Queue] = None
+
+async def _log_worker() -> None:
+    """Drain the log queue so Firebase writes never run on the request path.
+
+    Entries completing within LOG_BATCH_WINDOW of each other are coalesced
+    (up to LOG_BATCH_SIZE) into a single Firestore WriteBatch, turning a
+    burst of requests into one write RPC instead of one per request.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await _log_queue.get()]
+        # Sweep up already-queued entries first; get_nowait avoids the timer
+        # setup that wait_for pays per entry when the queue is busy
+        while len(batch) < LOG_BATCH_SIZE:
+            try:
+                batch.append(_log_queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        deadline = loop.time() + LOG_BATCH_WINDOW
+        while len(batch) < LOG_BATCH_SIZE and (remaining := deadline - loop.time()) > 0:
+            try:
+                batch.append(await asyncio.wait_for(_log_queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+        entries = []
+        for kind, payload in batch:
+            try:
+                if callable(payload):
+                    payload = payload()
+                entries.append((kind, payload))
+            except Exception as e:
+                logger.error(f"Error building queued log entry: {e}")
+
+        try:
+            if entries:
+                await firebase_logger.log_batch(entries)
+        except Exception as e:
+            logger.error(f"Error writing queued log batch: {e}")
+        finally:
+            for _ in batch:
+                _log_queue.task_done()
+
+def _enqueue_log(kind: str, payload) -> None:
+    """Queue a log entry; payload is an args tuple or a deferred builder.
+
+    When the queue is full the oldest entry is dropped in favour of the new
+    one, so a stalled Firebase keeps the most recent traffic in the log.
+    """
+    try:
+        _log_queue.put_nowait((kind, payload))
+    except asyncio.QueueFull:
+        try:
+            _log_queue.get_nowait()
+            _log_queue.task_done()
+            _log_queue.put_nowait((kind, payload))
+        except (asyncio.QueueEmpty, asyncio.QueueFull):
+            pass
+        logger.warning("Log queue full, dropped oldest log entry")
+
+def _enqueue_error_log(payload, status_code: int, message: str, error_type: str, metadata: Dict[str, Any]) -> None:
+    """Queue an error log entry in the standard details shape"""
+    error_details = {
+        'status_code': status_code,
+        'message': message,
+        'type': error_type
+    }
+    _enqueue_log('error', (payload, error_details, metadata))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _upstream_client, _log_queue
+    _upstream_client = httpx.AsyncClient(
+        http2=True,
+        # Fail connection attempts fast instead of letting them eat into the
+        # full read budget
+        timeout=httpx.Timeout(REQUEST_TIMEOUT, connect=5.0),
+        limits=HTTP_LIMITS
+    )
+    _log_queue = asyncio.Queue(maxsize=LOG_QUEUE_MAXSIZE)
+    log_worker_task = asyncio.create_task(_log_worker())
+    # Confirms uvloop is actually in use when launched via the entrypoint
+    logger.info(f"Event loop: {asyncio.get_running_loop().__class__}")
+    yield
+    log_worker_task.cancel()
+    await _upstream_client.aclose()
+
 app = FastAPI(
     title="Solar Proxy API",
     description="A proxy that relays OpenAI-compatible requests to Solar LLM with function calling support",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configuration
-UPSTAGE_API_URL = "https://api.upstage.ai/v1/chat/completions"
+UPSTAGE_API_URL: Final = "https://api.upstage.ai/v1/chat/completions"
 UPSTAGE_API_KEY = os.getenv("UPSTAGE_API_KEY")
 DEFAULT_MODEL_NAME = os.getenv("DEFAULT_MODEL_NAME", "solar-pro2-preview")
 
 # Timeout configuration
-REQUEST_TIMEOUT = 120.0
+REQUEST_TIMEOUT: Final = 120.0
+
+# Cheap non-cryptographic ids: random per-process prefix plus a monotonic
+# counter. Collision-free within a run and far cheaper than uuid4, which
+# hits os.urandom and hex-encodes 32 chars only to be truncated to 8
+_ID_PREFIX = secrets.token_hex(3)
+_ID_COUNTER = itertools.count()
+
+def _short_id() -> str:
+    """Generate a short unique id for chat/tool-call identifiers"""
+    return f"{_ID_PREFIX}{next(_ID_COUNTER):05x}"
+
+# orjson handles the per-chunk streaming hot path: it parses straight from
+# str/bytes and serializes to bytes several times faster than stdlib json
+_json_loads = orjson.loads
+
+def _sse_json(obj: Any) -> str:
+    """Serialize an SSE event payload with orjson"""
+    return orjson.dumps(obj).decode()
+
+# Function-call chunk events only vary in a few slots, so the constant keys
+# are baked into a bytes template; %-formatting the slots skips the dict
+# build and generic JSON encoding per event
+_FUNC_EVENT_TMPL = (
+    b'data: {"id":"%s","object":"chat.completion.chunk","created":1234567890,'
+    b'"model":"%s","choices":[{"index":%d,"delta":{"tool_calls":[{"index":%d,'
+    b'"id":"%s","type":"function","function":{"name":%s,"arguments":%s}}]},'
+    b'"logprobs":null,"finish_reason":"tool_calls"}]}\n\n'
+)
+
+# Interned once so every metadata dict shares the same string object
+_ENDPOINT: Final = sys.intern('/v1/chat/completions')
+
+# Metadata used when the log queue is saturated: Firebase is already
+# behind, so the per-request Starlette scope and header lookups are skipped
+# rather than enriching entries that are racing the drop-oldest policy
+_DEGRADED_METADATA = {
+    'mapped_model': None,
+    'client_ip': 'unknown',
+    'user_agent': 'unknown',
+    'endpoint': _ENDPOINT
+}
+
+# Standard SSE response headers; X-Accel-Buffering keeps intermediary
+# proxies from buffering the stream
+_SSE_HEADERS: Final[Dict[str, str]] = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no"
+}
+
+# HTTP/2 lets concurrent requests multiplex over a single TCP+TLS connection,
+# avoiding per-request connection setup against the upstream API
+HTTP_LIMITS = httpx.Limits(max_connections=1000, max_keepalive_connections=500)
+
+# Error dispatch table for chat_completions: exception type ->
+# (status_code, error_type, message builder). A None status code means
+# "use the upstream response's status code".
+_ERROR_MAP = {
+    json.JSONDecodeError: (400, 'json_decode_error', lambda e: f"Invalid JSON in request body: {str(e)}"),
+    httpx.TimeoutException: (504, 'timeout_error', lambda e: "Request to upstream service timed out"),
+    httpx.HTTPStatusError: (None, 'http_status_error', lambda e: f"Upstream API error: {e.response.text}"),
+}
+_UNEXPECTED_ERROR = (500, 'unexpected_error', lambda e: f"Internal server error: {str(e)}")
+
+def _classify_error(e: Exception) -> tuple:
+    """Map an exception to (status_code, error_type, message) via _ERROR_MAP.
+
+    isinstance matching so subclasses like httpx.ReadTimeout resolve to the
+    right entry; unknown exceptions fall through to the generic 500.
+    """
+    status_code, error_type, build_message = next(
+        (cfg for exc_type, cfg in _ERROR_MAP.items() if isinstance(e, exc_type)),
+        _UNEXPECTED_ERROR
+    )
+    if status_code is None:
+        status_code = e.response.status_code
+    return status_code, error_type, build_message(e)
 
 # Structured Output Support Functions
 def validate_json_schema(schema: Optional[Dict]) -> bool:
@@ -88,8 +275,68 @@ def validate_simple_type(value: Any, type_schema: Dict) -> bool:
     
     return False
 
+# msgspec type annotations for JSON schema primitive types
+_JSON_TYPE_MAP = {
+    "boolean": bool,
+    "string": str,
+    "number": Union[int, float],
+    "integer": int,
+    "array": list,
+    "object": dict,
+}
+
+# Cache of compiled msgspec Structs keyed by canonical schema JSON
+_compiled_struct_cache: Dict[str, Any] = {}
+
+def _field_annotation(field_schema: Dict) -> Any:
+    """Map a field schema to a msgspec-compatible type annotation"""
+    if "anyOf" in field_schema:
+        options = tuple(_field_annotation(option) for option in field_schema["anyOf"])
+        return Union[options]
+    return _JSON_TYPE_MAP.get(field_schema.get("type"), Any)
+
+def _compile_schema_struct(schema: Dict) -> Any:
+    """Compile (and cache) a msgspec Struct for a client JSON schema.
+
+    msgspec validates at C level in a single pass, so repeated requests with
+    the same schema skip the Python-level schema walk entirely.
+    """
+    cache_key = json.dumps(schema, sort_keys=True)
+    struct_type = _compiled_struct_cache.get(cache_key)
+    if struct_type is None:
+        properties = schema.get("properties", {})
+        required = set(schema.get("required", []))
+        # msgspec requires fields without defaults to come first
+        fields = [(name, _field_annotation(field_schema))
+                  for name, field_schema in properties.items() if name in required]
+        fields += [(name, Optional[_field_annotation(field_schema)], None)
+                   for name, field_schema in properties.items() if name not in required]
+        struct_type = msgspec.defstruct(
+            "StructuredOutput",
+            fields,
+            forbid_unknown_fields=schema.get("additionalProperties") is False
+        )
+        _compiled_struct_cache[cache_key] = struct_type
+    return struct_type
+
 def validate_response_against_schema(response_json: Dict, schema: Dict) -> bool:
     """Validate generated JSON against the schema"""
+    try:
+        struct_type = _compile_schema_struct(schema)
+    except Exception:
+        # Schema uses a shape defstruct can't express (e.g. non-identifier
+        # property names) - fall back to the Python validator
+        return _validate_response_against_schema_py(response_json, schema)
+
+    try:
+        msgspec.convert(response_json, struct_type, strict=True)
+    except msgspec.ValidationError as e:
+        raise ValueError(str(e))
+
+    return True
+
+def _validate_response_against_schema_py(response_json: Dict, schema: Dict) -> bool:
+    """Pure-Python schema validation fallback"""
     properties = schema.get("properties", {})
     required = schema.get("required", [])
     
@@ -113,36 +360,47 @@ def validate_response_against_schema(response_json: Dict, schema: Dict) -> bool:
     
     return True
 
+# Reasoning-mode sentinel, searched with str.partition (single scan)
+_THINK_CLOSE = '</think>'
+
+# Patterns for JSON wrapped in code markers, compiled once at import
+_JSON_BLOCK_PATTERNS = [
+    re.compile(r'```json\s*(.*?)\s*```', re.DOTALL),  # ```json ... ```
+    re.compile(r'```\s*(.*?)\s*```', re.DOTALL),      # ``` ... ```
+    re.compile(r'\{[\s\S]*\}'),                       # Bare JSON objects
+]
+
+def _strip_reasoning(text: str) -> str:
+    """Return the content after a </think> tag, or the full text if absent"""
+    _, sep, tail = text.partition(_THINK_CLOSE)
+    if sep:
+        tail = tail.strip()
+        if tail:
+            return tail
+    return text
+
 def extract_json_from_text(text: str) -> Dict:
     """Extract JSON from text response if model wraps it"""
     # Handle reasoning mode: extract content after </think> tag if present
-    working_content = text
-    if '<think>' in text and '</think>' in text:
-        post_think_content = text.split('</think>', 1)[-1].strip()
-        if post_think_content:
-            working_content = post_think_content
-    
-    # Try to parse the entire working content as JSON first
+    working_content = _strip_reasoning(text)
+
+    # Try to parse the entire working content as JSON first; msgspec decodes
+    # at C level in a single pass over the buffer, so large structured outputs
+    # avoid the allocation-heavy stdlib parse on this first attempt
     try:
-        return json.loads(working_content.strip())
-    except json.JSONDecodeError:
+        return msgspec.json.decode(working_content.strip())
+    except msgspec.DecodeError:
         pass
-    
+
     # Look for JSON blocks wrapped in code markers
-    json_patterns = [
-        r'```json\s*(.*?)\s*```',  # ```json ... ```
-        r'```\s*(.*?)\s*```',      # ``` ... ```
-        r'\{[\s\S]*\}',            # Bare JSON objects
-    ]
-    
-    for pattern in json_patterns:
-        matches = re.findall(pattern, working_content, re.DOTALL)
+    for pattern in _JSON_BLOCK_PATTERNS:
+        matches = pattern.findall(working_content)
         for match in matches:
             try:
                 return json.loads(match.strip())
             except json.JSONDecodeError:
                 continue
-    
+
     raise ValueError("No valid JSON found in response")
 
 def generate_structured_output_prompt(messages: List[Dict], schema: Dict, schema_name: str) -> List[Dict]:
@@ -191,7 +449,7 @@ def format_structured_output_response(json_content: str, original_response: Dict
     """Format structured output as OpenAI-compatible response"""
     
     return {
-        "id": original_response.get("id", f"chatcmpl-{uuid.uuid4().hex[:8]}"),
+        "id": original_response.get("id", f"chatcmpl-{_short_id()}"),
         "object": "chat.completion",
         "created": original_response.get("created", int(time.time())),
         "model": original_response.get("model", DEFAULT_MODEL_NAME),
@@ -212,9 +470,17 @@ def format_structured_output_response(json_content: str, original_response: Dict
         "system_fingerprint": original_response.get("system_fingerprint")
     }
 
-def generate_function_calling_prompt(messages: List[Dict], tools: List[Dict], tool_choice: Any = "auto") -> List[Dict]:
-    """Convert function calling request to prompt-engineered messages"""
-    
+@functools.lru_cache(maxsize=512)
+def _build_function_system_prompt(tools_json: str, tool_choice_json: str) -> str:
+    """Build the function-calling system prompt for a serialized tool-set.
+
+    Chat sessions send the same tools array on every turn, so the expensive
+    part (json.dumps of each tool's parameters plus the prompt assembly) is
+    memoized on the serialized tools + tool_choice.
+    """
+    tools = json.loads(tools_json)
+    tool_choice = json.loads(tool_choice_json)
+
     # Create function descriptions for the system prompt
     function_descriptions = []
     for tool in tools:
@@ -222,12 +488,12 @@ def generate_function_calling_prompt(messages: List[Dict], tools: List[Dict], to
             func = tool
             if "function" in tool:  # Handle nested function format
                 func = tool["function"]
-            
+
             desc = f"Function: {func['name']}\n"
             desc += f"Description: {func['description']}\n"
             desc += f"Parameters: {json.dumps(func['parameters'], indent=2)}\n"
             function_descriptions.append(desc)
-    
+
     # Create system message for function calling
     function_system_prompt = f"""You are an AI assistant with access to the following functions:
 
@@ -262,80 +528,176 @@ Tool choice setting: {tool_choice}
         forced_function = tool_choice.get("function", {}).get("name")
         function_system_prompt += f"\n7. You MUST call the function '{forced_function}' for this request. This is required regardless of what the user asks."
 
-    # Prepare messages with function calling context
-    enhanced_messages = []
-    
-    # Add or enhance system message
-    system_message_added = False
-    for msg in messages:
-        if msg.get("role") == "system":
-            enhanced_content = msg["content"] + "\n\n" + function_system_prompt
-            enhanced_messages.append({"role": "system", "content": enhanced_content})
-            system_message_added = True
-        else:
-            enhanced_messages.append(msg)
-    
-    # Add system message if none existed
-    if not system_message_added:
-        enhanced_messages.insert(0, {"role": "system", "content": function_system_prompt})
-    
+    return function_system_prompt
+
+def generate_function_calling_prompt(messages: List[Dict], tools: List[Dict], tool_choice: Any = "auto") -> List[Dict]:
+    """Convert function calling request to prompt-engineered messages"""
+
+    # Fetch the (memoized) system prompt for this tool-set
+    function_system_prompt = _build_function_system_prompt(
+        json.dumps(tools, sort_keys=True),
+        json.dumps(tool_choice, sort_keys=True)
+    )
+
+    # System messages lead the conversation by convention, so only the first
+    # message needs checking. The caller's system prompt stays first and
+    # untouched - it is the stable prefix across turns, so upstream prompt
+    # caching can still hit on it - with the tool instructions added as a
+    # separate system message right after
+    if messages and messages[0].get("role") == "system":
+        enhanced_messages = [
+            messages[0],
+            {"role": "system", "content": function_system_prompt},
+            *messages[1:]
+        ]
+    else:
+        enhanced_messages = [
+            {"role": "system", "content": function_system_prompt},
+            *messages
+        ]
+
     return enhanced_messages
 
+def _iter_json_spans(text: str) -> Iterator[str]:
+    """Yield balanced top-level JSON array/object spans from text.
+
+    Single left-to-right scan tracking bracket depth and string/escape state,
+    so nested tool-argument objects come back whole - unlike non-greedy
+    regexes, which truncate at the first closing bracket and backtrack badly
+    on long content. Prose between spans is skipped with C-level find calls
+    rather than walking it character by character.
+    """
+    depth = 0
+    start = -1
+    in_string = False
+    escape = False
+    n = len(text)
+    i = 0
+
+    while i < n:
+        if depth == 0:
+            # Outside any span only an opening bracket matters; jump to the
+            # nearest one instead of stepping through the prose
+            br = text.find('[', i)
+            cu = text.find('{', i)
+            if br == -1 and cu == -1:
+                return
+            i = min(x for x in (br, cu) if x != -1)
+            start = i
+            depth = 1
+            i += 1
+            continue
+
+        ch = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == '[' or ch == '{':
+            depth += 1
+        elif ch == ']' or ch == '}':
+            depth -= 1
+            if depth == 0:
+                yield text[start:i + 1]
+        i += 1
+
+# Deterministic (temperature=0) non-streaming completions are served from a
+# small TTL'd LRU keyed on the client key plus canonicalized body, skipping
+# the upstream round-trip entirely on a hit
+_RESP_CACHE_MAX: Final = 512
+_RESP_CACHE_TTL: Final = 300.0  # seconds
+_resp_cache: "OrderedDict[bytes, tuple]" = OrderedDict()
+
+def _cache_response(cache_key: Optional[bytes], body_bytes: bytes) -> None:
+    """Store a completed response body for a cacheable request"""
+    if cache_key is None:
+        return
+    _resp_cache[cache_key] = (body_bytes, time.monotonic() + _RESP_CACHE_TTL)
+    _resp_cache.move_to_end(cache_key)
+    if len(_resp_cache) > _RESP_CACHE_MAX:
+        _resp_cache.popitem(last=False)
+
+# Identical completions are common (temperature=0 retries, canonical tool
+# outputs), so parse results are memoized by content hash. Entries are
+# treated as read-only by every caller.
+_FC_CACHE_MAX: Final = 2048
+_fc_cache: "OrderedDict[bytes, tuple]" = OrderedDict()
+
 def parse_function_calls(content: str) -> tuple[List[Dict], Optional[str]]:
+    """Parse Solar's response to extract function calls (cached by content hash)"""
+    key = hashlib.blake2b(content.encode(), digest_size=16).digest()
+    cached = _fc_cache.get(key)
+    if cached is not None:
+        _fc_cache.move_to_end(key)
+        return cached
+
+    result = _parse_function_calls_uncached(content)
+    _fc_cache[key] = result
+    if len(_fc_cache) > _FC_CACHE_MAX:
+        _fc_cache.popitem(last=False)
+    return result
+
+def _parse_function_calls_uncached(content: str) -> tuple[List[Dict], Optional[str]]:
     """Parse Solar's response to extract function calls"""
-    
+
     # Handle reasoning mode: extract content after </think> tag if present
-    working_content = content
-    if '<think>' in content and '</think>' in content:
-        # Extract content after the thinking section
-        post_think_content = content.split('</think>', 1)[-1].strip()
-        if post_think_content:
-            working_content = post_think_content
-    
-    # Try to find JSON array in the response
-    json_pattern = r'\[[\s\S]*?\]'
-    json_matches = re.findall(json_pattern, working_content)
-    
+    working_content = _strip_reasoning(content)
+
+    # Pure-prose responses are the common case for tool_choice="auto"; two
+    # substring checks are far cheaper than running the span scanner on
+    # content that can't possibly hold a function call
+    if '[{' not in working_content and '{"type"' not in working_content:
+        return [], content if content else None
+
+    # Scan once for balanced JSON spans; only these are fed to the JSON parser
+    json_spans = list(_iter_json_spans(working_content))
+
     function_calls = []
     remaining_text = content
-    
-    for json_match in json_matches:
+
+    for json_match in json_spans:
+        if not json_match.startswith('['):
+            continue
         try:
-            parsed = json.loads(json_match)
+            parsed = _json_loads(json_match)
             if isinstance(parsed, list):
                 for item in parsed:
                     if isinstance(item, dict) and item.get("type") == "function_call":
                         # Ensure required fields and generate IDs if missing
                         if "id" not in item:
-                            item["id"] = f"fc_{uuid.uuid4().hex[:8]}"
+                            item["id"] = f"fc_{_short_id()}"
                         if "call_id" not in item:
-                            item["call_id"] = f"call_{uuid.uuid4().hex[:8]}"
+                            item["call_id"] = f"call_{_short_id()}"
                         function_calls.append(item)
-                
+
                 # Remove the JSON from the text
                 remaining_text = remaining_text.replace(json_match, "").strip()
         except json.JSONDecodeError:
             continue
-    
+
     # If no function calls found, try single object format
     if not function_calls:
-        single_json_pattern = r'\{[\s\S]*?\}'
-        single_matches = re.findall(single_json_pattern, working_content)
-        
-        for json_match in single_matches:
+        for json_match in json_spans:
+            if not json_match.startswith('{'):
+                continue
             try:
-                parsed = json.loads(json_match)
+                parsed = _json_loads(json_match)
                 if isinstance(parsed, dict) and parsed.get("type") == "function_call":
                     if "id" not in parsed:
-                        parsed["id"] = f"fc_{uuid.uuid4().hex[:8]}"
+                        parsed["id"] = f"fc_{_short_id()}"
                     if "call_id" not in parsed:
-                        parsed["call_id"] = f"call_{uuid.uuid4().hex[:8]}"
+                        parsed["call_id"] = f"call_{_short_id()}"
                     function_calls.append(parsed)
                     remaining_text = remaining_text.replace(json_match, "").strip()
                     break
             except json.JSONDecodeError:
                 continue
-    
+
     return function_calls, remaining_text if remaining_text else None
 
 def format_function_call_response(function_calls: List[Dict], original_response: Dict) -> Dict:
@@ -350,7 +712,7 @@ def format_function_call_response(function_calls: List[Dict], original_response:
                 "role": "assistant",
                 "content": None,
                 "tool_calls": [{
-                    "id": func_call.get("call_id", f"call_{uuid.uuid4().hex[:8]}"),
+                    "id": func_call.get("call_id", f"call_{_short_id()}"),
                     "type": "function",
                     "function": {
                         "name": func_call["name"],
@@ -368,7 +730,7 @@ def format_function_call_response(function_calls: List[Dict], original_response:
         choices = [original_response.get("choices", [{}])[0]]
     
     return {
-        "id": original_response.get("id", f"chatcmpl-{uuid.uuid4().hex[:8]}"),
+        "id": original_response.get("id", f"chatcmpl-{_short_id()}"),
         "object": "chat.completion",
         "created": original_response.get("created"),
         "model": original_response.get("model"),
@@ -377,208 +739,107 @@ def format_function_call_response(function_calls: List[Dict], original_response:
         "system_fingerprint": original_response.get("system_fingerprint")
     }
 
+def _body_for_logging(raw_body: bytes, upstream_content: Optional[Dict]) -> Union[bytes, Dict]:
+    """Return the request payload to log, attaching the modified upstream payload.
+
+    The common passthrough case hands the raw request bytes straight to the
+    logger, which parses them off the request path. Only when the upstream
+    payload was modified (tools or structured output) is the original parsed
+    here so the two can be logged side by side.
+    """
+    if upstream_content:
+        return {**json.loads(raw_body), '_upstream_content': upstream_content}
+    return raw_body
+
+def _split_sse_lines(line_buffer: bytearray, chunk: bytes) -> List[bytes]:
+    """Split buffered SSE bytes into complete lines in one C-level pass.
+
+    Appends the chunk to the persistent buffer, returns every newline-
+    terminated line (terminator stripped), and leaves the trailing partial
+    line buffered for the next chunk. bytes.split does the scanning in C,
+    replacing the Python-level find/slice/delete loop per line.
+    """
+    line_buffer += chunk
+    if b'\n' not in line_buffer:
+        return []
+    *lines, tail = bytes(line_buffer).split(b'\n')
+    line_buffer.clear()
+    line_buffer += tail
+    return lines
+
+def _schedule_stream_log(build_payload) -> None:
+    """Log a completed stream to Firebase via the background queue.
+
+    The payload builder runs inside the log worker, so neither the dict
+    construction nor the Firebase write delays delivery of the final
+    SSE bytes to the client.
+    """
+    _enqueue_log('response', build_payload)
+
 async def stream_response_with_logging(
     response: httpx.Response, 
-    original_body: Dict, 
+    raw_body: bytes, 
     upstream_content: Dict,
     start_time: float,
     original_model: str,
-    request: Request
-) -> AsyncGenerator[str, None]:
-    """Stream the response from the upstream API with logging"""
-    accumulated_response = ""
-    accumulated_content = ""
+    base_metadata: Dict[str, Any]
+) -> AsyncGenerator[bytes, None]:
+    """Stream the response from the upstream API with logging.
+
+    No tools are in play on this path, so nothing in the stream needs
+    parsing: only the first data line is decoded (for the response id) and
+    every other chunk costs a length bump plus a line-prefix count.
+    """
+    content_length = 0
+    chunks_received = 0
     response_id = None
-    
+    line_buffer = bytearray()
+
     try:
-        async for chunk in response.aiter_text():
+        async for chunk in response.aiter_bytes():
             if chunk:
-                accumulated_response += chunk
-                
-                # Try to extract content from streaming chunks
-                lines = chunk.split('\n')
-                for line in lines:
-                    if line.startswith('data: '):
-                        data_str = line[6:]
-                        if data_str.strip() != '[DONE]':
-                            try:
-                                data = json.loads(data_str)
-                                if not response_id:
-                                    response_id = data.get('id', f"chatcmpl-{uuid.uuid4().hex[:8]}")
-                                
-                                delta_content = data.get('choices', [{}])[0].get('delta', {}).get('content')
-                                if delta_content:
-                                    accumulated_content += delta_content
-                            except json.JSONDecodeError:
-                                pass
-                
+                content_length += len(chunk)
+
+                if response_id is None:
+                    # Scan lines only until the first event yields an id
+                    for line in _split_sse_lines(line_buffer, chunk):
+                        if line.startswith(b'data: '):
+                            chunks_received += 1
+                            data_bytes = line[6:]
+                            if response_id is None and data_bytes.strip() != b'[DONE]':
+                                try:
+                                    response_id = _json_loads(data_bytes).get('id')
+                                except json.JSONDecodeError:
+                                    pass
+                else:
+                    chunks_received += chunk.count(b'data: ')
+
+                # Forward the original bytes untouched
                 yield chunk
     except Exception as e:
         logger.error(f"Error streaming response: {e}")
-        yield f"data: {json.dumps({'error': str(e)})}\n\n"
+        yield f"data: {_sse_json({'error': str(e)})}\n\n"
     finally:
-        # Log the complete streaming response in proper OpenAI format
-        response_time = (time.time() - start_time) * 1000
-        metadata = {
-            'response_time_ms': response_time,
-            'status_code': 200,
-            'original_model': original_model,
-            'mapped_model': DEFAULT_MODEL_NAME,
-            'client_ip': request.client.host if request.client else 'unknown',
-            'user_agent': request.headers.get('user-agent', 'unknown'),
-            'is_streaming': True,
-            'function_calls_detected': 0,
-            'endpoint': '/v1/chat/completions'
-        }
-        
-        # Create a proper OpenAI chat completion response format for logging
-        response_data = {
-            "id": response_id or f"chatcmpl-{uuid.uuid4().hex[:8]}",
-            "object": "chat.completion",
-            "created": int(time.time()),
-            "model": DEFAULT_MODEL_NAME,
-            "choices": [{
-                "index": 0,
-                "message": {
-                    "role": "assistant",
-                    "content": accumulated_content
-                },
-                "logprobs": None,
-                "finish_reason": "stop"
-            }],
-            "usage": {
-                "prompt_tokens": -1,  # Not available in streaming
-                "completion_tokens": -1,  # Not available in streaming 
-                "total_tokens": -1
-            },
-            "_streaming_metadata": {
-                "content_length": len(accumulated_response),
-                "chunks_received": len([line for line in accumulated_response.split('\n') if line.startswith('data:')])
+        # Release the upstream connection back to the pool
+        await response.aclose()
+
+        # Log the complete streaming response in proper OpenAI format; the
+        # payload dicts are built inside the fire-and-forget logging task
+        response_time = (time.perf_counter() - start_time) * 1000
+
+        def _build_log_payload():
+            metadata = {
+                **base_metadata,
+                'response_time_ms': response_time,
+                'status_code': 200,
+                'original_model': original_model,
+                'is_streaming': True,
+                'function_calls_detected': 0
             }
-        }
-        
-        # Create enhanced original_body with upstream_content if modified
-        enhanced_original_body = original_body.copy()
-        if upstream_content:
-            enhanced_original_body['_upstream_content'] = upstream_content
-        
-        # Async log to Firebase (fire and forget)
-        asyncio.create_task(firebase_logger.log_request_response(enhanced_original_body, response_data, metadata))
 
-async def stream_function_call_response_with_logging(
-    response: httpx.Response, 
-    tools: List[Dict],
-    original_body: Dict, 
-    upstream_content: Dict,
-    start_time: float,
-    original_model: str,
-    request: Request
-) -> AsyncGenerator[str, None]:
-    """Stream function call responses in OpenAI format with logging"""
-    
-    accumulated_content = ""
-    accumulated_response = ""
-    response_id = f"chatcmpl-{uuid.uuid4().hex[:8]}"
-    function_calls_detected = 0
-    extracted_function_calls = []
-    
-    try:
-        async for chunk in response.aiter_text():
-            if chunk:
-                accumulated_response += chunk
-                # Try to parse streaming data
-                lines = chunk.split('\n')
-                for line in lines:
-                    if line.startswith('data: '):
-                        data_str = line[6:]
-                        if data_str.strip() == '[DONE]':
-                            # Process accumulated content for function calls
-                            function_calls, remaining_text = parse_function_calls(accumulated_content)
-                            
-                            if function_calls:
-                                function_calls_detected = len(function_calls)
-                                extracted_function_calls = function_calls
-                                # Send function call events
-                                for i, func_call in enumerate(function_calls):
-                                    # Send function call start event
-                                    func_event = {
-                                        "id": response_id,
-                                        "object": "chat.completion.chunk",
-                                        "created": 1234567890,
-                                        "model": DEFAULT_MODEL_NAME,
-                                        "choices": [{
-                                            "index": i,
-                                            "delta": {
-                                                "tool_calls": [{
-                                                    "index": i,
-                                                    "id": func_call.get("call_id", f"call_{uuid.uuid4().hex[:8]}"),
-                                                    "type": "function",
-                                                    "function": {
-                                                        "name": func_call["name"],
-                                                        "arguments": func_call["arguments"]
-                                                    }
-                                                }]
-                                            },
-                                            "logprobs": None,
-                                            "finish_reason": "tool_calls"
-                                        }]
-                                    }
-                                    yield f"data: {json.dumps(func_event)}\n\n"
-                            
-                            yield "data: [DONE]\n\n"
-                            return
-                        
-                        try:
-                            data = json.loads(data_str)
-                            delta_content = data.get('choices', [{}])[0].get('delta', {}).get('content')
-                            if delta_content:
-                                accumulated_content += delta_content
-                                
-                                # Check if we're building function calls
-                                if '[{' in accumulated_content or '{"type"' in accumulated_content:
-                                    # Don't stream content while building function calls
-                                    continue
-                                else:
-                                    # Stream normal content
-                                    yield chunk
-                        except json.JSONDecodeError:
-                            yield chunk
-                    else:
-                        yield chunk
-    except Exception as e:
-        logger.error(f"Error streaming function call response: {e}")
-        yield f"data: {json.dumps({'error': str(e)})}\n\n"
-    finally:
-        # Log the complete streaming response in proper OpenAI format
-        response_time = (time.time() - start_time) * 1000
-        metadata = {
-            'response_time_ms': response_time,
-            'status_code': 200,
-            'original_model': original_model,
-            'mapped_model': DEFAULT_MODEL_NAME,
-            'client_ip': request.client.host if request.client else 'unknown',
-            'user_agent': request.headers.get('user-agent', 'unknown'),
-            'is_streaming': True,
-            'function_calls_detected': function_calls_detected,
-            'endpoint': '/v1/chat/completions'
-        }
-        
-        # Create a proper OpenAI chat completion response format for logging
-        if function_calls_detected > 0:
-            # Format as function calling response
-            tool_calls = []
-            for i, func_call in enumerate(extracted_function_calls):
-                tool_calls.append({
-                    "id": func_call.get("call_id", f"call_{uuid.uuid4().hex[:8]}"),
-                    "type": "function",
-                    "function": {
-                        "name": func_call["name"],
-                        "arguments": func_call["arguments"]
-                    }
-                })
-            
+            # Create a proper OpenAI chat completion response format for logging
             response_data = {
-                "id": response_id,
+                "id": response_id or f"chatcmpl-{_short_id()}",
                 "object": "chat.completion",
                 "created": int(time.time()),
                 "model": DEFAULT_MODEL_NAME,
@@ -586,24 +847,181 @@ async def stream_function_call_response_with_logging(
                     "index": 0,
                     "message": {
                         "role": "assistant",
-                        "content": None,
-                        "tool_calls": tool_calls
+                        # Content is not captured on the passthrough path;
+                        # byte/chunk counts live in _streaming_metadata
+                        "content": None
                     },
                     "logprobs": None,
-                    "finish_reason": "tool_calls"
+                    "finish_reason": "stop"
                 }],
                 "usage": {
                     "prompt_tokens": -1,  # Not available in streaming
-                    "completion_tokens": -1,  # Not available in streaming 
+                    "completion_tokens": -1,  # Not available in streaming
                     "total_tokens": -1
                 },
                 "_streaming_metadata": {
-                    "content_length": len(accumulated_response),
-                    "chunks_received": len([line for line in accumulated_response.split('\n') if line.startswith('data:')])
+                    "content_length": content_length,
+                    "chunks_received": chunks_received
                 }
             }
-        else:
-            # Format as regular response
+
+            # Attach the modified upstream payload for logging (no copy when unmodified)
+            return _body_for_logging(raw_body, upstream_content), response_data, metadata
+
+        _schedule_stream_log(_build_log_payload)
+
+def _new_fc_stats() -> Dict[str, Any]:
+    """Fresh counter/accumulator state for a function-call stream"""
+    return {
+        'content_length': 0,
+        'chunks_received': 0,
+        'content_parts': [],
+        'function_calls_detected': 0,
+        'extracted_function_calls': [],
+    }
+
+async def _stream_fc_core(
+    response: httpx.Response,
+    response_id: str,
+    stats: Dict[str, Any]
+) -> AsyncGenerator[bytes, None]:
+    """Shared SSE-scanning and function-call detection loop.
+
+    Yields the passthrough/function-call SSE bytes for the client and records
+    counters and extracted calls in stats, so the logging and non-logging
+    wrappers share one scanner implementation.
+    """
+    content_parts = stats['content_parts']
+    content_tail = ""  # rolling window so markers split across deltas are caught
+    building_function_calls = False
+    line_buffer = bytearray()
+
+    async for chunk in response.aiter_bytes():
+        if chunk:
+            stats['content_length'] += len(chunk)
+            # Pull complete SSE lines out of the persistent buffer so
+            # events split across chunk boundaries parse correctly
+            for line in _split_sse_lines(line_buffer, chunk):
+                if line.startswith(b'data: '):
+                    stats['chunks_received'] += 1
+                    data_bytes = line[6:]
+                    if data_bytes.strip() == b'[DONE]':
+                        # Only parse the accumulated content if a function
+                        # call marker was ever seen while streaming
+                        if building_function_calls:
+                            accumulated_content = ''.join(content_parts)
+                            function_calls, remaining_text = parse_function_calls(accumulated_content)
+                        else:
+                            function_calls = []
+
+                        if function_calls:
+                            stats['function_calls_detected'] = len(function_calls)
+                            stats['extracted_function_calls'] = function_calls
+                            # Send function call events from the bytes template
+                            for i, func_call in enumerate(function_calls):
+                                yield _FUNC_EVENT_TMPL % (
+                                    response_id.encode(),
+                                    DEFAULT_MODEL_NAME.encode(),
+                                    i,
+                                    i,
+                                    func_call.get("call_id", f"call_{_short_id()}").encode(),
+                                    orjson.dumps(func_call["name"]),
+                                    orjson.dumps(func_call["arguments"]),
+                                )
+
+                        yield b"data: [DONE]\n\n"
+                        return
+
+                    try:
+                        data = _json_loads(data_bytes)
+                        delta_content = data.get('choices', [{}])[0].get('delta', {}).get('content')
+                        if delta_content:
+                            content_parts.append(delta_content)
+
+                            # Check if we're building function calls; the flag is
+                            # sticky, so only the tail of the accumulated content
+                            # needs scanning per delta instead of the whole string
+                            if not building_function_calls:
+                                probe = content_tail + delta_content
+                                if '[{' in probe or '{"type"' in probe:
+                                    building_function_calls = True
+                                content_tail = probe[-8:]
+                            if building_function_calls:
+                                # Don't stream content while building function calls
+                                continue
+                            # Stream normal content
+                            yield line + b'\n'
+                    except json.JSONDecodeError:
+                        yield line + b'\n'
+                else:
+                    yield line + b'\n'
+
+async def stream_function_call_response_with_logging(
+    response: httpx.Response, 
+    tools: List[Dict],
+    raw_body: bytes, 
+    upstream_content: Dict,
+    start_time: float,
+    original_model: str,
+    base_metadata: Dict[str, Any]
+) -> AsyncGenerator[bytes, None]:
+    """Stream function call responses in OpenAI format with logging"""
+
+    response_id = f"chatcmpl-{_short_id()}"
+    stats = _new_fc_stats()
+
+    try:
+        async for event in _stream_fc_core(response, response_id, stats):
+            yield event
+    except Exception as e:
+        logger.error(f"Error streaming function call response: {e}")
+        yield f"data: {_sse_json({'error': str(e)})}\n\n".encode()
+    finally:
+        # Release the upstream connection back to the pool
+        await response.aclose()
+
+        # Log the complete streaming response in proper OpenAI format
+        response_time = (time.perf_counter() - start_time) * 1000
+
+        def _build_log_payload():
+            function_calls_detected = stats['function_calls_detected']
+            metadata = {
+                **base_metadata,
+                'response_time_ms': response_time,
+                'status_code': 200,
+                'original_model': original_model,
+                'is_streaming': True,
+                'function_calls_detected': function_calls_detected
+            }
+
+            # Create a proper OpenAI chat completion response format for logging
+            if function_calls_detected > 0:
+                # Format as function calling response
+                tool_calls = []
+                for i, func_call in enumerate(stats['extracted_function_calls']):
+                    tool_calls.append({
+                        "id": func_call.get("call_id", f"call_{_short_id()}"),
+                        "type": "function",
+                        "function": {
+                            "name": func_call["name"],
+                            "arguments": func_call["arguments"]
+                        }
+                    })
+
+                message = {
+                    "role": "assistant",
+                    "content": None,
+                    "tool_calls": tool_calls
+                }
+                finish_reason = "tool_calls"
+            else:
+                # Format as regular response
+                message = {
+                    "role": "assistant",
+                    "content": ''.join(stats['content_parts'])
+                }
+                finish_reason = "stop"
+
             response_data = {
                 "id": response_id,
                 "object": "chat.completion",
@@ -611,12 +1029,9 @@ async def stream_function_call_response_with_logging(
                 "model": DEFAULT_MODEL_NAME,
                 "choices": [{
                     "index": 0,
-                    "message": {
-                        "role": "assistant",
-                        "content": accumulated_content
-                    },
+                    "message": message,
                     "logprobs": None,
-                    "finish_reason": "stop"
+                    "finish_reason": finish_reason
                 }],
                 "usage": {
                     "prompt_tokens": -1,  # Not available in streaming
@@ -624,18 +1039,15 @@ async def stream_function_call_response_with_logging(
                     "total_tokens": -1
                 },
                 "_streaming_metadata": {
-                    "content_length": len(accumulated_response),
-                    "chunks_received": len([line for line in accumulated_response.split('\n') if line.startswith('data:')])
+                    "content_length": stats['content_length'],
+                    "chunks_received": stats['chunks_received']
                 }
             }
-        
-        # Create enhanced original_body with upstream_content if modified
-        enhanced_original_body = original_body.copy()
-        if upstream_content:
-            enhanced_original_body['_upstream_content'] = upstream_content
-        
-        # Async log to Firebase (fire and forget)
-        asyncio.create_task(firebase_logger.log_request_response(enhanced_original_body, response_data, metadata))
+
+            # Attach the modified upstream payload for logging (no copy when unmodified)
+            return _body_for_logging(raw_body, upstream_content), response_data, metadata
+
+        _schedule_stream_log(_build_log_payload)
 
 async def stream_response(response: httpx.Response) -> AsyncGenerator[str, None]:
     """Stream the response from the upstream API"""
@@ -645,111 +1057,58 @@ async def stream_response(response: httpx.Response) -> AsyncGenerator[str, None]
                 yield chunk
     except Exception as e:
         logger.error(f"Error streaming response: {e}")
-        yield f"data: {json.dumps({'error': str(e)})}\n\n"
+        yield f"data: {_sse_json({'error': str(e)})}\n\n"
+
+async def stream_function_call_response(response: httpx.Response, tools: List[Dict]) -> AsyncGenerator[bytes, None]:
+    """Stream function call responses in OpenAI format (no logging)"""
+
+    response_id = f"chatcmpl-{_short_id()}"
 
-async def stream_function_call_response(response: httpx.Response, tools: List[Dict]) -> AsyncGenerator[str, None]:
-    """Stream function call responses in OpenAI format"""
-    
-    accumulated_content = ""
-    response_id = f"chatcmpl-{uuid.uuid4().hex[:8]}"
-    
     try:
-        async for chunk in response.aiter_text():
-            if chunk:
-                # Try to parse streaming data
-                lines = chunk.split('\n')
-                for line in lines:
-                    if line.startswith('data: '):
-                        data_str = line[6:]
-                        if data_str.strip() == '[DONE]':
-                            # Process accumulated content for function calls
-                            function_calls, remaining_text = parse_function_calls(accumulated_content)
-                            
-                            if function_calls:
-                                # Send function call events
-                                for i, func_call in enumerate(function_calls):
-                                    # Send function call start event
-                                    func_event = {
-                                        "id": response_id,
-                                        "object": "chat.completion.chunk",
-                                        "created": 1234567890,
-                                        "model": DEFAULT_MODEL_NAME,
-                                        "choices": [{
-                                            "index": i,
-                                            "delta": {
-                                                "tool_calls": [{
-                                                    "index": i,
-                                                    "id": func_call.get("call_id", f"call_{uuid.uuid4().hex[:8]}"),
-                                                    "type": "function",
-                                                    "function": {
-                                                        "name": func_call["name"],
-                                                        "arguments": func_call["arguments"]
-                                                    }
-                                                }]
-                                            },
-                                            "logprobs": None,
-                                            "finish_reason": "tool_calls"
-                                        }]
-                                    }
-                                    yield f"data: {json.dumps(func_event)}\n\n"
-                            
-                            yield "data: [DONE]\n\n"
-                            return
-                        
-                        try:
-                            data = json.loads(data_str)
-                            delta_content = data.get('choices', [{}])[0].get('delta', {}).get('content')
-                            if delta_content:
-                                accumulated_content += delta_content
-                                
-                                # Check if we're building function calls
-                                if '[{' in accumulated_content or '{"type"' in accumulated_content:
-                                    # Don't stream content while building function calls
-                                    continue
-                                else:
-                                    # Stream normal content
-                                    yield chunk
-                        except json.JSONDecodeError:
-                            yield chunk
-                    else:
-                        yield chunk
+        async for event in _stream_fc_core(response, response_id, _new_fc_stats()):
+            yield event
     except Exception as e:
         logger.error(f"Error streaming function call response: {e}")
-        yield f"data: {json.dumps({'error': str(e)})}\n\n"
+        yield f"data: {_sse_json({'error': str(e)})}\n\n".encode()
 
 async def stream_structured_output_response_with_logging(
     response: httpx.Response, 
     schema: Dict,
     schema_name: str,
-    original_body: Dict, 
+    raw_body: bytes, 
     upstream_content: Dict,
     start_time: float,
     original_model: str,
-    request: Request
+    base_metadata: Dict[str, Any]
 ) -> AsyncGenerator[str, None]:
     """Stream structured output responses with validation and logging"""
     
-    accumulated_content = ""
-    accumulated_response = ""
-    response_id = f"chatcmpl-{uuid.uuid4().hex[:8]}"
+    # Deltas collect in lists and are joined once when needed; string
+    # concatenation here would be quadratic in response length
+    content_parts = []
+    content_length = 0
+    chunks_received = 0
+    response_id = f"chatcmpl-{_short_id()}"
     validation_successful = False
     validated_json = ""
     
     try:
         async for chunk in response.aiter_text():
             if chunk:
-                accumulated_response += chunk
+                content_length += len(chunk)
                 # Try to parse streaming data
                 lines = chunk.split('\n')
                 for line in lines:
                     if line.startswith('data: '):
+                        chunks_received += 1
                         data_str = line[6:]
                         if data_str.strip() == '[DONE]':
                             # Process accumulated content for structured output
+                            accumulated_content = ''.join(content_parts)
                             try:
                                 response_json = extract_json_from_text(accumulated_content)
                                 validate_response_against_schema(response_json, schema)
-                                validated_json = json.dumps(response_json)
+                                validated_json = _sse_json(response_json)
                                 validation_successful = True
                                 
                                 # Send the final validated JSON content
@@ -767,7 +1126,7 @@ async def stream_structured_output_response_with_logging(
                                         "finish_reason": "stop"
                                     }]
                                 }
-                                yield f"data: {json.dumps(final_event)}\n\n"
+                                yield f"data: {_sse_json(final_event)}\n\n"
                                 
                             except (ValueError, json.JSONDecodeError) as e:
                                 logger.error(f"Structured output validation failed: {e}")
@@ -786,16 +1145,16 @@ async def stream_structured_output_response_with_logging(
                                         "finish_reason": "stop"
                                     }]
                                 }
-                                yield f"data: {json.dumps(error_event)}\n\n"
+                                yield f"data: {_sse_json(error_event)}\n\n"
                             
                             yield "data: [DONE]\n\n"
                             return
                         
                         try:
-                            data = json.loads(data_str)
+                            data = _json_loads(data_str)
                             delta_content = data.get('choices', [{}])[0].get('delta', {}).get('content')
                             if delta_content:
-                                accumulated_content += delta_content
+                                content_parts.append(delta_content)
                                 # Don't stream content until we validate it
                                 continue
                         except json.JSONDecodeError:
@@ -805,67 +1164,67 @@ async def stream_structured_output_response_with_logging(
                         yield chunk
     except Exception as e:
         logger.error(f"Error streaming structured output response: {e}")
-        yield f"data: {json.dumps({'error': str(e)})}\n\n"
+        yield f"data: {_sse_json({'error': str(e)})}\n\n"
     finally:
-        # Log the complete streaming response
-        response_time = (time.time() - start_time) * 1000
-        metadata = {
-            'response_time_ms': response_time,
-            'status_code': 200,
-            'original_model': original_model,
-            'mapped_model': DEFAULT_MODEL_NAME,
-            'client_ip': request.client.host if request.client else 'unknown',
-            'user_agent': request.headers.get('user-agent', 'unknown'),
-            'is_streaming': True,
-            'structured_output_requested': True,
-            'structured_output_valid': validation_successful,
-            'schema_name': schema_name,
-            'endpoint': '/v1/chat/completions'
-        }
-        
-        # Create a proper OpenAI chat completion response format for logging
-        response_data = {
-            "id": response_id,
-            "object": "chat.completion",
-            "created": int(time.time()),
-            "model": DEFAULT_MODEL_NAME,
-            "choices": [{
-                "index": 0,
-                "message": {
-                    "role": "assistant",
-                    "content": validated_json if validation_successful else accumulated_content
+        # Release the upstream connection back to the pool
+        await response.aclose()
+
+        # Log the complete streaming response; the payload dicts are built
+        # inside the fire-and-forget logging task
+        response_time = (time.perf_counter() - start_time) * 1000
+
+        def _build_log_payload():
+            metadata = {
+                **base_metadata,
+                'response_time_ms': response_time,
+                'status_code': 200,
+                'original_model': original_model,
+                'is_streaming': True,
+                'structured_output_requested': True,
+                'structured_output_valid': validation_successful,
+                'schema_name': schema_name
+            }
+
+            # Create a proper OpenAI chat completion response format for logging
+            response_data = {
+                "id": response_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": DEFAULT_MODEL_NAME,
+                "choices": [{
+                    "index": 0,
+                    "message": {
+                        "role": "assistant",
+                        "content": validated_json if validation_successful else ''.join(content_parts)
+                    },
+                    "logprobs": None,
+                    "finish_reason": "stop"
+                }],
+                "usage": {
+                    "prompt_tokens": -1,  # Not available in streaming
+                    "completion_tokens": -1,  # Not available in streaming
+                    "total_tokens": -1
                 },
-                "logprobs": None,
-                "finish_reason": "stop"
-            }],
-            "usage": {
-                "prompt_tokens": -1,  # Not available in streaming
-                "completion_tokens": -1,  # Not available in streaming 
-                "total_tokens": -1
-            },
-            "_streaming_metadata": {
-                "content_length": len(accumulated_response),
-                "chunks_received": len([line for line in accumulated_response.split('\n') if line.startswith('data:')]),
-                "structured_output_validation": {
-                    "requested_schema": schema_name,
-                    "validation_successful": validation_successful
+                "_streaming_metadata": {
+                    "content_length": content_length,
+                    "chunks_received": chunks_received,
+                    "structured_output_validation": {
+                        "requested_schema": schema_name,
+                        "validation_successful": validation_successful
+                    }
                 }
             }
-        }
-        
-        # Create enhanced original_body with upstream_content if modified
-        enhanced_original_body = original_body.copy()
-        if upstream_content:
-            enhanced_original_body['_upstream_content'] = upstream_content
-        
-        # Async log to Firebase (fire and forget)
-        asyncio.create_task(firebase_logger.log_request_response(enhanced_original_body, response_data, metadata))
+
+            # Attach the modified upstream payload for logging (no copy when unmodified)
+            return _body_for_logging(raw_body, upstream_content), response_data, metadata
+
+        _schedule_stream_log(_build_log_payload)
 
 async def stream_structured_output_response(response: httpx.Response, schema: Dict, schema_name: str) -> AsyncGenerator[str, None]:
     """Stream structured output responses with validation (no logging)"""
     
     accumulated_content = ""
-    response_id = f"chatcmpl-{uuid.uuid4().hex[:8]}"
+    response_id = f"chatcmpl-{_short_id()}"
     
     try:
         async for chunk in response.aiter_text():
@@ -880,7 +1239,7 @@ async def stream_structured_output_response(response: httpx.Response, schema: Di
                             try:
                                 response_json = extract_json_from_text(accumulated_content)
                                 validate_response_against_schema(response_json, schema)
-                                validated_json = json.dumps(response_json)
+                                validated_json = _sse_json(response_json)
                                 
                                 # Send the final validated JSON content
                                 final_event = {
@@ -897,7 +1256,7 @@ async def stream_structured_output_response(response: httpx.Response, schema: Di
                                         "finish_reason": "stop"
                                     }]
                                 }
-                                yield f"data: {json.dumps(final_event)}\n\n"
+                                yield f"data: {_sse_json(final_event)}\n\n"
                                 
                             except (ValueError, json.JSONDecodeError) as e:
                                 logger.error(f"Structured output validation failed: {e}")
@@ -916,13 +1275,13 @@ async def stream_structured_output_response(response: httpx.Response, schema: Di
                                         "finish_reason": "stop"
                                     }]
                                 }
-                                yield f"data: {json.dumps(error_event)}\n\n"
+                                yield f"data: {_sse_json(error_event)}\n\n"
                             
                             yield "data: [DONE]\n\n"
                             return
                         
                         try:
-                            data = json.loads(data_str)
+                            data = _json_loads(data_str)
                             delta_content = data.get('choices', [{}])[0].get('delta', {}).get('content')
                             if delta_content:
                                 accumulated_content += delta_content
@@ -935,7 +1294,7 @@ async def stream_structured_output_response(response: httpx.Response, schema: Di
                         yield chunk
     except Exception as e:
         logger.error(f"Error streaming structured output response: {e}")
-        yield f"data: {json.dumps({'error': str(e)})}\n\n"
+        yield f"data: {_sse_json({'error': str(e)})}\n\n"
 
 def generate_schema_example(schema: Dict) -> str:
     """Generate an example JSON output based on the schema"""
@@ -1089,48 +1448,47 @@ async def debug_structured_output(request: Request):
             "temperature": 0.3
         }
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(UPSTAGE_API_URL, headers=headers, json=test_payload)
-            
-            if response.status_code != 200:
-                return {
-                    "error": "Upstream API error",
-                    "status_code": response.status_code,
-                    "response_text": response.text
-                }
-            
-            response_data = response.json()
-            content = response_data.get('choices', [{}])[0].get('message', {}).get('content', '')
-            
-            # Test JSON extraction
-            try:
-                extracted_json = extract_json_from_text(content)
-                extraction_success = True
-                extraction_error = None
-            except Exception as e:
-                extracted_json = None
-                extraction_success = False
-                extraction_error = str(e)
-            
+        response = await _upstream_client.post(UPSTAGE_API_URL, headers=headers, json=test_payload, timeout=60.0)
+
+        if response.status_code != 200:
             return {
-                "upstream_response": {
-                    "status_code": response.status_code,
-                    "content": content,
-                    "full_response": response_data
-                },
-                "extraction": {
-                    "success": extraction_success,
-                    "extracted_json": extracted_json,
-                    "error": extraction_error
-                },
-                "diagnostics": {
-                    "content_length": len(content),
-                    "contains_think_tags": "<think>" in content and "</think>" in content,
-                    "contains_json_blocks": "```json" in content or "```" in content,
-                    "contains_braces": "{" in content and "}" in content
-                }
+                "error": "Upstream API error",
+                "status_code": response.status_code,
+                "response_text": response.text
             }
-    
+
+        response_data = _json_loads(response.content)
+        content = response_data.get('choices', [{}])[0].get('message', {}).get('content', '')
+
+        # Test JSON extraction
+        try:
+            extracted_json = extract_json_from_text(content)
+            extraction_success = True
+            extraction_error = None
+        except Exception as e:
+            extracted_json = None
+            extraction_success = False
+            extraction_error = str(e)
+
+        return {
+            "upstream_response": {
+                "status_code": response.status_code,
+                "content": content,
+                "full_response": response_data
+            },
+            "extraction": {
+                "success": extraction_success,
+                "extracted_json": extracted_json,
+                "error": extraction_error
+            },
+            "diagnostics": {
+                "content_length": len(content),
+                "contains_think_tags": "<think>" in content and "</think>" in content,
+                "contains_json_blocks": "```json" in content or "```" in content,
+                "contains_braces": "{" in content and "}" in content
+            }
+        }
+
     except Exception as e:
         return {
             "error": "Debug endpoint error",
@@ -1159,20 +1517,50 @@ async def chat_completions(request: Request):
         )
     
     # Track timing and metadata for Firebase logging
-    start_time = time.time()
-    original_body = None
+    start_time = time.perf_counter()
+    raw_body = None
     upstream_content = None  # Store modified content sent to upstream
     response_data = None
     function_calls_detected = 0
+
+    # Fields shared by every logged outcome, built once so the success and
+    # error branches just overlay their own status/timing on a shallow copy
+    if _log_queue is not None and _log_queue.full():
+        base_metadata = _DEGRADED_METADATA
+    else:
+        base_metadata = {
+            'mapped_model': DEFAULT_MODEL_NAME,
+            'client_ip': request.client.host if request.client else 'unknown',
+            'user_agent': request.headers.get('user-agent', 'unknown'),
+            'endpoint': _ENDPOINT
+        }
     
     try:
-        # Parse the incoming request body
-        body = await request.json()
-        original_body = body.copy()  # Keep original for logging
+        # Parse the incoming request body once from the raw bytes; the bytes
+        # are retained for logging so no pristine copy of the dict is needed
+        raw_body = await request.body()
+        body = _json_loads(raw_body)
         
         # Log original model request
         original_model = body.get("model", "not specified")
         logger.debug(f"Request for model '{original_model}' -> mapping to '{DEFAULT_MODEL_NAME}'")
+
+        # Deterministic requests are cacheable; the key covers the client's
+        # API key so responses never leak across credentials
+        cache_key = None
+        if body.get("temperature") in (0, 0.0) and not body.get("stream", False):
+            cache_key = hashlib.blake2b(
+                client_api_key.encode() + orjson.dumps(body, option=orjson.OPT_SORT_KEYS),
+                digest_size=16
+            ).digest()
+            cached = _resp_cache.get(cache_key)
+            if cached is not None:
+                cached_bytes, expiry = cached
+                if time.monotonic() < expiry:
+                    _resp_cache.move_to_end(cache_key)
+                    return Response(content=cached_bytes, media_type="application/json",
+                                    headers={'X-Cache': 'HIT'})
+                del _resp_cache[cache_key]
         
         # Override the model with our default
         body["model"] = DEFAULT_MODEL_NAME
@@ -1244,360 +1632,300 @@ async def chat_completions(request: Request):
         
         # Check if streaming is requested
         is_streaming = body.get("stream", False)
-        
-        async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
-            response = await client.post(
-                UPSTAGE_API_URL, 
-                headers=headers, 
-                json=body,
+
+        # The model/reasoning rewrites above mean the raw request bytes can
+        # never be forwarded verbatim, but the upstream payload only needs
+        # encoding once - orjson to bytes here, not httpx's stdlib json= path
+        upstream_body = orjson.dumps(body)
+
+        if is_streaming:
+            # Stream the upstream response so bytes reach the client as they
+            # arrive; buffering via post() would make time-to-first-token
+            # equal to upstream time-to-last-token
+            upstream_request = _upstream_client.build_request(
+                "POST",
+                UPSTAGE_API_URL,
+                headers=headers,
+                content=upstream_body,
                 timeout=REQUEST_TIMEOUT
             )
-            
-            # If upstream returns an error, pass it through
+            response = await _upstream_client.send(upstream_request, stream=True)
             if response.status_code != 200:
-                error_text = response.text
-                logger.error(f"Upstream API error: {response.status_code} - {error_text}")
-                
-                # Log error to Firebase
-                response_time = (time.time() - start_time) * 1000
+                # Error bodies are small; pull them in for the error path below
+                await response.aread()
+                await response.aclose()
+        else:
+            response = await _upstream_client.post(
+                UPSTAGE_API_URL,
+                headers=headers,
+                content=upstream_body,
+                timeout=REQUEST_TIMEOUT
+            )
+
+        # If upstream returns an error, pass it through
+        if response.status_code != 200:
+            error_text = response.text
+            logger.error(f"Upstream API error: {response.status_code} - {error_text}")
+
+            # Log error to Firebase
+            response_time = (time.perf_counter() - start_time) * 1000
+            metadata = {
+                **base_metadata,
+                'response_time_ms': response_time,
+                'status_code': response.status_code,
+                'original_model': original_model,
+                'is_streaming': is_streaming
+            }
+
+            # Attach the modified upstream payload for logging (no copy when unmodified)
+            enhanced_original_body = _body_for_logging(raw_body, upstream_content)
+
+            # Async log to Firebase (fire and forget)
+            _enqueue_error_log(enhanced_original_body, response.status_code, error_text, 'upstream_api_error', metadata)
+
+            # Relay upstream error directly to client
+            return Response(content=error_text, status_code=response.status_code, media_type="application/json")
+
+        # Handle streaming response
+        if is_streaming:
+            if structured_output_schema:
+                # Special handling for structured output streaming
+                return StreamingResponse(
+                    stream_structured_output_response_with_logging(
+                        response, 
+                        structured_output_schema, 
+                        structured_output_schema_name, 
+                        raw_body, 
+                        upstream_content, 
+                        start_time, 
+                        original_model, 
+                        base_metadata
+                    ),
+                    media_type="text/event-stream",
+                    headers=_SSE_HEADERS
+                )
+            elif tools:
+                # Special handling for function call streaming
+                return StreamingResponse(
+                    stream_function_call_response_with_logging(response, tools, raw_body, upstream_content, start_time, original_model, base_metadata),
+                    media_type="text/event-stream",
+                    headers=_SSE_HEADERS
+                )
+            else:
+                # Regular streaming
+                return StreamingResponse(
+                    stream_response_with_logging(response, raw_body, upstream_content, start_time, original_model, base_metadata),
+                    media_type="text/event-stream",
+                    headers=_SSE_HEADERS
+                )
+
+        # Handle non-streaming response
+        else:
+            # With no tools and no schema the body needs no inspection at
+            # all: relay the upstream bytes untouched and hand them to the
+            # log worker, which parses them off the request path
+            if not tools and not structured_output_schema:
+                response_time = (time.perf_counter() - start_time) * 1000
                 metadata = {
+                    **base_metadata,
                     'response_time_ms': response_time,
-                    'status_code': response.status_code,
+                    'status_code': 200,
                     'original_model': original_model,
-                    'mapped_model': DEFAULT_MODEL_NAME,
-                    'client_ip': request.client.host if request.client else 'unknown',
-                    'user_agent': request.headers.get('user-agent', 'unknown'),
-                    'is_streaming': is_streaming,
-                    'endpoint': '/v1/chat/completions'
+                    'is_streaming': False
                 }
-                
-                error_details = {
-                    'status_code': response.status_code,
-                    'message': error_text,
-                    'type': 'upstream_api_error'
-                }
-                
-                # Create enhanced original_body with upstream_content if modified
-                enhanced_original_body = original_body.copy()
-                if upstream_content:
-                    enhanced_original_body['_upstream_content'] = upstream_content
-                
-                # Async log to Firebase (fire and forget)
-                asyncio.create_task(firebase_logger.log_error(enhanced_original_body, error_details, metadata))
-                
-                # Relay upstream error directly to client
-                return Response(content=error_text, status_code=response.status_code, media_type="application/json")
-            
-            # Handle streaming response
-            if is_streaming:
-                if structured_output_schema:
-                    # Special handling for structured output streaming
-                    return StreamingResponse(
-                        stream_structured_output_response_with_logging(
-                            response, 
-                            structured_output_schema, 
-                            structured_output_schema_name, 
-                            original_body, 
-                            upstream_content, 
-                            start_time, 
-                            original_model, 
-                            request
-                        ),
-                        media_type="text/plain",
-                        headers={
-                            "Cache-Control": "no-cache",
-                            "Connection": "keep-alive",
-                            "Content-Type": "text/plain; charset=utf-8"
-                        }
-                    )
-                elif tools:
-                    # Special handling for function call streaming
-                    return StreamingResponse(
-                        stream_function_call_response_with_logging(response, tools, original_body, upstream_content, start_time, original_model, request),
-                        media_type="text/plain",
-                        headers={
-                            "Cache-Control": "no-cache",
-                            "Connection": "keep-alive",
-                            "Content-Type": "text/plain; charset=utf-8"
-                        }
-                    )
-                else:
-                    # Regular streaming
-                    return StreamingResponse(
-                        stream_response_with_logging(response, original_body, upstream_content, start_time, original_model, request),
-                        media_type="text/plain",
-                        headers={
-                            "Cache-Control": "no-cache",
-                            "Connection": "keep-alive",
-                            "Content-Type": "text/plain; charset=utf-8"
-                        }
-                    )
-            
-            # Handle non-streaming response
-            else:
-                response_data = response.json()
-                
-                # Process structured output response if schema was provided
-                if structured_output_schema:
-                    content = response_data.get('choices', [{}])[0].get('message', {}).get('content', '')
-                    
-                    # Retry logic for structured output validation
-                    max_retries = 3
-                    retry_count = 0
-                    validation_successful = False
-                    last_error = None
-                    
-                    while retry_count < max_retries and not validation_successful:
-                        try:
-                            # Extract and validate JSON from the response
-                            response_json = extract_json_from_text(content)
-                            validate_response_against_schema(response_json, structured_output_schema)
-                            
-                            # Format as structured output response
-                            validated_json = json.dumps(response_json)
-                            formatted_response = format_structured_output_response(validated_json, response_data)
-                            response_data = formatted_response
-                            validation_successful = True
-                            logger.debug(f"Structured output validated successfully for schema: {structured_output_schema_name}" + 
-                                      (f" (after {retry_count} retries)" if retry_count > 0 else ""))
-                            
-                        except (ValueError, json.JSONDecodeError) as e:
-                            retry_count += 1
-                            last_error = e
-                            logger.warning(f"Structured output validation failed (attempt {retry_count}/{max_retries}): {e}")
-                            
-                            if retry_count < max_retries:
-                                # Retry with adjusted parameters
-                                logger.debug(f"Retrying structured output request (attempt {retry_count + 1}/{max_retries})")
-                                
-                                # Adjust temperature slightly for retry (make it more focused)
-                                retry_temperature = max(0.1, body.get("temperature", 0.7) - (retry_count * 0.2))
-                                
-                                # Create retry request body
-                                retry_body = body.copy()
-                                retry_body["temperature"] = retry_temperature
-                                retry_body["max_tokens"] = body.get("max_tokens", 1000)
-                                
-                                # Enhanced prompt for retry
-                                if retry_count == 1:
-                                    # First retry: emphasize JSON format
-                                    enhanced_messages = []
-                                    for msg in retry_body["messages"]:
-                                        if msg.get("role") == "system":
-                                            enhanced_content = msg["content"] + "\n\nIMPORTANT: You MUST respond with ONLY valid JSON. Do not include any explanatory text, code blocks, or reasoning. Just the raw JSON object."
-                                            enhanced_messages.append({"role": "system", "content": enhanced_content})
-                                        else:
-                                            enhanced_messages.append(msg)
-                                    retry_body["messages"] = enhanced_messages
-                                elif retry_count == 2:
-                                    # Second retry: add example and simplify
-                                    enhanced_messages = []
-                                    for msg in retry_body["messages"]:
-                                        if msg.get("role") == "system":
-                                            schema_example = generate_schema_example(structured_output_schema)
-                                            enhanced_content = msg["content"] + f"\n\nEXAMPLE OUTPUT:\n{schema_example}\n\nRespond with EXACTLY this format - pure JSON only."
-                                            enhanced_messages.append({"role": "system", "content": enhanced_content})
-                                        else:
-                                            enhanced_messages.append(msg)
-                                    retry_body["messages"] = enhanced_messages
-                                
-                                # Make retry request
-                                async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as retry_client:
-                                    retry_response = await retry_client.post(
-                                        UPSTAGE_API_URL, 
-                                        headers=headers, 
-                                        json=retry_body,
-                                        timeout=REQUEST_TIMEOUT
-                                    )
-                                    
-                                    if retry_response.status_code == 200:
-                                        response_data = retry_response.json()
-                                        content = response_data.get('choices', [{}])[0].get('message', {}).get('content', '')
-                                        logger.debug(f"Retry {retry_count} response content: {content[:200]}...")
+                _enqueue_log('response', (raw_body, response.content, metadata))
+                _cache_response(cache_key, response.content)
+                return Response(content=response.content, media_type="application/json",
+                                headers={'X-Cache': 'MISS'})
+
+            response_data = _json_loads(response.content)
+
+            # Process structured output response if schema was provided
+            if structured_output_schema:
+                content = response_data.get('choices', [{}])[0].get('message', {}).get('content', '')
+
+                # Retry logic for structured output validation
+                max_retries = 3
+                retry_count = 0
+                validation_successful = False
+                last_error = None
+
+                while retry_count < max_retries and not validation_successful:
+                    try:
+                        # Extract and validate JSON from the response
+                        response_json = extract_json_from_text(content)
+                        validate_response_against_schema(response_json, structured_output_schema)
+
+                        # Format as structured output response
+                        validated_json = json.dumps(response_json)
+                        formatted_response = format_structured_output_response(validated_json, response_data)
+                        response_data = formatted_response
+                        validation_successful = True
+                        logger.debug(f"Structured output validated successfully for schema: {structured_output_schema_name}" + 
+                                  (f" (after {retry_count} retries)" if retry_count > 0 else ""))
+
+                    except (ValueError, json.JSONDecodeError) as e:
+                        retry_count += 1
+                        last_error = e
+                        logger.warning(f"Structured output validation failed (attempt {retry_count}/{max_retries}): {e}")
+
+                        if retry_count < max_retries:
+                            # Retry with adjusted parameters
+                            logger.debug(f"Retrying structured output request (attempt {retry_count + 1}/{max_retries})")
+
+                            # Adjust temperature slightly for retry (make it more focused)
+                            retry_temperature = max(0.1, body.get("temperature", 0.7) - (retry_count * 0.2))
+
+                            # Create retry request body
+                            retry_body = body.copy()
+                            retry_body["temperature"] = retry_temperature
+                            retry_body["max_tokens"] = body.get("max_tokens", 1000)
+
+                            # Enhanced prompt for retry
+                            if retry_count == 1:
+                                # First retry: emphasize JSON format
+                                enhanced_messages = []
+                                for msg in retry_body["messages"]:
+                                    if msg.get("role") == "system":
+                                        enhanced_content = msg["content"] + "\n\nIMPORTANT: You MUST respond with ONLY valid JSON. Do not include any explanatory text, code blocks, or reasoning. Just the raw JSON object."
+                                        enhanced_messages.append({"role": "system", "content": enhanced_content})
                                     else:
-                                        logger.error(f"Retry {retry_count} failed with status {retry_response.status_code}")
-                                        break
+                                        enhanced_messages.append(msg)
+                                retry_body["messages"] = enhanced_messages
+                            elif retry_count == 2:
+                                # Second retry: add example and simplify
+                                enhanced_messages = []
+                                for msg in retry_body["messages"]:
+                                    if msg.get("role") == "system":
+                                        schema_example = generate_schema_example(structured_output_schema)
+                                        enhanced_content = msg["content"] + f"\n\nEXAMPLE OUTPUT:\n{schema_example}\n\nRespond with EXACTLY this format - pure JSON only."
+                                        enhanced_messages.append({"role": "system", "content": enhanced_content})
+                                    else:
+                                        enhanced_messages.append(msg)
+                                retry_body["messages"] = enhanced_messages
+
+                            # Make retry request
+                            retry_response = await _upstream_client.post(
+                                UPSTAGE_API_URL, 
+                                headers=headers, 
+                                content=orjson.dumps(retry_body),
+                                timeout=REQUEST_TIMEOUT
+                            )
+
+                            if retry_response.status_code == 200:
+                                response_data = _json_loads(retry_response.content)
+                                content = response_data.get('choices', [{}])[0].get('message', {}).get('content', '')
+                                logger.debug(f"Retry {retry_count} response content: {content[:200]}...")
+                            elif retry_response.status_code == 429 or retry_response.status_code >= 500:
+                                # Transient upstream failure: leave content unchanged so the
+                                # next loop iteration issues another upstream attempt
+                                logger.warning(f"Retry {retry_count} hit transient upstream error {retry_response.status_code}")
                             else:
-                                # All retries exhausted
-                                logger.error(f"All {max_retries} structured output validation attempts failed. Last error: {last_error}")
-                                # Log the actual content that failed validation for debugging
-                                logger.error(f"Final content that failed validation: {content[:500]}...")
-                                
-                                # Return detailed error response
-                                error_response = {
-                                    "error": {
-                                        "message": f"Structured output validation failed after {max_retries} attempts: {str(last_error)}",
-                                        "type": "structured_output_validation_error",
-                                        "param": structured_output_schema_name,
-                                        "code": "invalid_structured_output",
-                                        "details": {
-                                            "attempts": max_retries,
-                                            "last_error": str(last_error),
-                                            "content_preview": content[:200] if content else "No content"
-                                        }
-                                    }
-                                }
-                                
+                                # Terminal upstream error (auth, bad request, ...): further
+                                # retries just burn latency and API spend, relay it directly
+                                logger.error(f"Retry {retry_count} failed with terminal status {retry_response.status_code}, aborting retries")
                                 return Response(
-                                    content=json.dumps(error_response),
-                                    status_code=400,
+                                    content=retry_response.text,
+                                    status_code=retry_response.status_code,
                                     media_type="application/json"
                                 )
-                
-                # Process function calling response if tools were provided
-                elif tools:
-                    content = response_data.get('choices', [{}])[0].get('message', {}).get('content', '')
-                    function_calls, remaining_text = parse_function_calls(content)
-                    
-                    if function_calls:
-                        function_calls_detected = len(function_calls)
-                        logger.debug(f"Detected {function_calls_detected} function calls")
-                        formatted_response = format_function_call_response(function_calls, response_data)
-                        response_data = formatted_response
-                    else:
-                        logger.debug("No function calls detected, returning normal response")
-                
-                # Calculate response time and prepare metadata
-                response_time = (time.time() - start_time) * 1000
-                metadata = {
-                    'response_time_ms': response_time,
-                    'status_code': 200,
-                    'original_model': original_model,
-                    'mapped_model': DEFAULT_MODEL_NAME,
-                    'client_ip': request.client.host if request.client else 'unknown',
-                    'user_agent': request.headers.get('user-agent', 'unknown'),
-                    'is_streaming': is_streaming,
-                    'function_calls_detected': function_calls_detected,
-                    'structured_output_requested': bool(structured_output_schema),
-                    'structured_output_schema_name': structured_output_schema_name if structured_output_schema else None,
-                    'endpoint': '/v1/chat/completions'
-                }
-                
-                # Create enhanced original_body with upstream_content if modified
-                enhanced_original_body = original_body.copy()
-                if upstream_content:
-                    enhanced_original_body['_upstream_content'] = upstream_content
-                
-                # Async log to Firebase (fire and forget)
-                asyncio.create_task(firebase_logger.log_request_response(enhanced_original_body, response_data, metadata))
-                
-                return response_data
-    
-    except json.JSONDecodeError as e:
-        # Log JSON decode error
-        response_time = (time.time() - start_time) * 1000
-        metadata = {
-            'response_time_ms': response_time,
-            'status_code': 400,
-            'original_model': original_body.get('model') if original_body else 'unknown',
-            'mapped_model': DEFAULT_MODEL_NAME,
-            'client_ip': request.client.host if request.client else 'unknown',
-            'user_agent': request.headers.get('user-agent', 'unknown'),
-            'endpoint': '/v1/chat/completions'
-        }
-        
-        error_details = {
-            'status_code': 400,
-            'message': f"Invalid JSON in request body: {str(e)}",
-            'type': 'json_decode_error'
-        }
-        
-        asyncio.create_task(firebase_logger.log_error(original_body or {}, error_details, metadata))
-        
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid JSON in request body: {str(e)}"
-        )
-    except httpx.TimeoutException:
-        logger.error("Request to upstream API timed out")
-        
-        # Log timeout error
-        response_time = (time.time() - start_time) * 1000
-        metadata = {
-            'response_time_ms': response_time,
-            'status_code': 504,
-            'original_model': original_body.get('model') if original_body else 'unknown',
-            'mapped_model': DEFAULT_MODEL_NAME,
-            'client_ip': request.client.host if request.client else 'unknown',
-            'user_agent': request.headers.get('user-agent', 'unknown'),
-            'endpoint': '/v1/chat/completions'
-        }
-        
-        error_details = {
-            'status_code': 504,
-            'message': 'Request to upstream service timed out',
-            'type': 'timeout_error'
-        }
-        
-        asyncio.create_task(firebase_logger.log_error(original_body or {}, error_details, metadata))
-        
-        raise HTTPException(
-            status_code=504,
-            detail="Request to upstream service timed out"
-        )
-    except httpx.HTTPStatusError as e:
-        logger.error(f"HTTP error from upstream: {e.response.status_code} - {e.response.text}")
-        
-        # Log HTTP status error
-        response_time = (time.time() - start_time) * 1000
-        metadata = {
-            'response_time_ms': response_time,
-            'status_code': e.response.status_code,
-            'original_model': original_body.get('model') if original_body else 'unknown',
-            'mapped_model': DEFAULT_MODEL_NAME,
-            'client_ip': request.client.host if request.client else 'unknown',
-            'user_agent': request.headers.get('user-agent', 'unknown'),
-            'endpoint': '/v1/chat/completions'
-        }
-        
-        error_details = {
-            'status_code': e.response.status_code,
-            'message': f'Upstream API error: {e.response.text}',
-            'type': 'http_status_error'
-        }
-        
-        asyncio.create_task(firebase_logger.log_error(original_body or {}, error_details, metadata))
-        
-        raise HTTPException(
-            status_code=e.response.status_code,
-            detail=f"Upstream API error: {e.response.text}"
-        )
+                        else:
+                            # All retries exhausted
+                            logger.error(f"All {max_retries} structured output validation attempts failed. Last error: {last_error}")
+                            # Log the actual content that failed validation for debugging
+                            logger.error(f"Final content that failed validation: {content[:500]}...")
+
+                            # Return detailed error response
+                            error_response = {
+                                "error": {
+                                    "message": f"Structured output validation failed after {max_retries} attempts: {str(last_error)}",
+                                    "type": "structured_output_validation_error",
+                                    "param": structured_output_schema_name,
+                                    "code": "invalid_structured_output",
+                                    "details": {
+                                        "attempts": max_retries,
+                                        "last_error": str(last_error),
+                                        "content_preview": content[:200] if content else "No content"
+                                    }
+                                }
+                            }
+
+                            return Response(
+                                content=json.dumps(error_response),
+                                status_code=400,
+                                media_type="application/json"
+                            )
+
+            # Process function calling response if tools were provided
+            elif tools:
+                content = response_data.get('choices', [{}])[0].get('message', {}).get('content', '')
+                function_calls, remaining_text = parse_function_calls(content)
+
+                if function_calls:
+                    function_calls_detected = len(function_calls)
+                    logger.debug(f"Detected {function_calls_detected} function calls")
+                    formatted_response = format_function_call_response(function_calls, response_data)
+                    response_data = formatted_response
+                else:
+                    logger.debug("No function calls detected, returning normal response")
+
+            # Calculate response time and prepare metadata
+            response_time = (time.perf_counter() - start_time) * 1000
+            metadata = {
+                **base_metadata,
+                'response_time_ms': response_time,
+                'status_code': 200,
+                'original_model': original_model,
+                'is_streaming': is_streaming,
+                'function_calls_detected': function_calls_detected,
+                'structured_output_requested': bool(structured_output_schema),
+                'structured_output_schema_name': structured_output_schema_name if structured_output_schema else None
+            }
+
+            # Attach the modified upstream payload for logging (no copy when unmodified)
+            enhanced_original_body = _body_for_logging(raw_body, upstream_content)
+
+            # Async log to Firebase (fire and forget)
+            _enqueue_log('response', (enhanced_original_body, response_data, metadata))
+
+            response_bytes = orjson.dumps(response_data)
+            _cache_response(cache_key, response_bytes)
+            return Response(content=response_bytes, media_type="application/json",
+                            headers={'X-Cache': 'MISS'})
+
     except HTTPException:
         # Re-raise HTTPExceptions (like our 400 errors) so they aren't caught by the generic handler
         raise
     except Exception as e:
-        logger.error(f"Unexpected error: {e}")
-        
-        # Log unexpected error
-        response_time = (time.time() - start_time) * 1000
+        status_code, error_type, message = _classify_error(e)
+        logger.error(f"Request failed ({error_type}): {message}")
+
+        # Recover the parsed payload for error logging (cold path; the raw
+        # bytes may themselves be the invalid JSON that got us here)
+        try:
+            payload = _json_loads(raw_body) if raw_body else {}
+        except (json.JSONDecodeError, ValueError):
+            payload = {}
+
+        # Log error to Firebase
+        response_time = (time.perf_counter() - start_time) * 1000
         metadata = {
+            **base_metadata,
             'response_time_ms': response_time,
-            'status_code': 500,
-            'original_model': original_body.get('model') if original_body else 'unknown',
-            'mapped_model': DEFAULT_MODEL_NAME,
-            'client_ip': request.client.host if request.client else 'unknown',
-            'user_agent': request.headers.get('user-agent', 'unknown'),
-            'endpoint': '/v1/chat/completions'
-        }
-        
-        error_details = {
-            'status_code': 500,
-            'message': f'Internal server error: {str(e)}',
-            'type': 'unexpected_error'
+            'status_code': status_code,
+            'original_model': payload.get('model') if payload else 'unknown'
         }
-        
-        asyncio.create_task(firebase_logger.log_error(original_body or {}, error_details, metadata))
-        
-        raise HTTPException(
-            status_code=500,
-            detail=f"Internal server error: {str(e)}"
-        )
+
+        _enqueue_error_log(payload, status_code, message, error_type, metadata)
+
+        raise HTTPException(status_code=status_code, detail=message)
 
 # Optional: Add models endpoint for compatibility
-@app.get("/v1/models")
-async def list_models():
-    """List available models (returns only solar-pro2-preview)"""
-    models = [
+# The response is completely static, so serialize it once at import time
+# instead of rebuilding and re-serializing the dict on every probe
+_MODELS_RESPONSE_BYTES = orjson.dumps({
+    "object": "list",
+    "data": [
         {
             "id": "solar-pro2-preview",
             "object": "model",
@@ -1608,21 +1936,30 @@ async def list_models():
             "parent": None
         }
     ]
-    return {
-        "object": "list",
-        "data": models
-    }
+})
+
+@app.get("/v1/models")
+async def list_models():
+    """List available models (returns only solar-pro2-preview)"""
+    return Response(content=_MODELS_RESPONSE_BYTES, media_type="application/json")
 
 # Catch-all for other v1 endpoints to provide helpful error messages
+# Static part of the 404 detail, precomputed so endpoint scanners only cost
+# us a short string concatenation per probe
+_UNSUPPORTED_ENDPOINT_SUFFIX = " is not supported by this proxy. Supported endpoints: /v1/chat/completions, /v1/models"
+
 @app.api_route("/v1/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH"])
 async def catch_all_v1(path: str, request: Request):
     """Catch-all for unsupported v1 endpoints"""
     logger.warning(f"Unsupported endpoint requested: {request.method} /v1/{path}")
     raise HTTPException(
         status_code=404,
-        detail=f"Endpoint /v1/{path} is not supported by this proxy. Supported endpoints: /v1/chat/completions, /v1/models"
+        detail="Endpoint /v1/" + path + _UNSUPPORTED_ENDPOINT_SUFFIX
     )
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    # uvloop + httptools (bundled with uvicorn[standard]) replace the stdlib
+    # event loop and pure-Python HTTP parser; both pay off here since every
+    # request spawns upstream I/O plus a background logging task
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, loop="uvloop", http="httptools")
\ No newline at end of file
@@ -0,0 +1,17 @@
+"""Shared configuration loading for the test scripts
+
+Each script used to call load_dotenv('.env.local') at import, re-parsing
+the file once per module. Funneling the lookup through one cached function
+parses it at most once per process regardless of how many test modules a
+runner imports.
+"""
+
+import functools
+import os
+from dotenv import load_dotenv
+
+@functools.cache
+def get_api_key() -> str:
+    """Return the Upstage API key, loading .env.local on first use"""
+    load_dotenv('.env.local', override=False)
+    return os.getenv('UPSTAGE_API_KEY', 'test-key')
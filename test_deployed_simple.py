@@ -3,13 +3,12 @@
 Simple test for deployed Solar proxy once API key is configured
 """
 
-import requests
-import json
-import os
-from dotenv import load_dotenv
+import httpx
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from test_config import get_api_key
 
-load_dotenv('.env.local')
-UPSTAGE_API_KEY = os.getenv('UPSTAGE_API_KEY', 'test-key')
+UPSTAGE_API_KEY = get_api_key()
 
 LOCAL_URL = "http://localhost:8000"
 DEPLOYED_URL = "https://solar-fc-proxy.vercel.app"
@@ -19,19 +18,63 @@ headers = {
     "Authorization": f"Bearer {UPSTAGE_API_KEY}"
 }
 
+# One keep-alive client for both targets so each host's TLS/TCP setup is
+# paid once; http2=True multiplexes against the Vercel host and falls
+# back to HTTP/1.1 for the local dev server
+CLIENT = httpx.Client(
+    http2=True,
+    headers=headers,
+    timeout=15,
+    limits=httpx.Limits(max_keepalive_connections=4, max_connections=8)
+)
+
+# Both test bodies are static, so they are serialized once at import
+HELLO_BODY = orjson.dumps({
+    "model": "gpt-4",
+    "messages": [{"role": "user", "content": "Hello, test!"}]
+})
+
+CALC_BODY = orjson.dumps({
+    "model": "gpt-4",
+    "messages": [
+        {"role": "user", "content": "What is 25 * 4?"}
+    ],
+    "tools": [{
+        "type": "function",
+        "function": {
+            "name": "calculate",
+            "description": "Perform calculations",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "expression": {"type": "string", "description": "Math expression"}
+                },
+                "required": ["expression"]
+            }
+        }
+    }],
+    "tool_choice": "auto"
+})
+
+def post_chat(url, body_bytes, **kwargs):
+    """POST a precomputed chat body to url's completions endpoint"""
+    return CLIENT.post(f"{url}/v1/chat/completions", content=body_bytes, **kwargs)
+
 def run_test(url):
-    payload = {
-        "model": "gpt-4",
-        "messages": [{"role": "user", "content": "Hello, test!"}]
-    }
     print(f"\nTesting {url}/v1/chat/completions ...")
     try:
-        response = requests.post(f"{url}/v1/chat/completions", headers=headers, json=payload, timeout=15)
+        # Cheap warm-up GET: pays the handshake so the POST below reuses
+        # the pooled connection
+        try:
+            CLIENT.get(f"{url}/health", timeout=5)
+        except httpx.HTTPError:
+            pass
+        response = post_chat(url, HELLO_BODY)
         print(f"Status: {response.status_code}")
         try:
-            print(f"Response: {response.json()}")
+            print(f"Response: {orjson.loads(response.content)}")
         except Exception:
-            print(f"Raw response: {response.text}")
+            print(f"Raw response: {response.content[:512].decode('utf-8', errors='replace')}")
     except Exception as e:
         print(f"❌ Error connecting to {url}: {e}")
 
@@ -39,51 +82,24 @@ def test_deployed_proxy():
     url = "https://solar-fc-proxy.vercel.app"
     
     print("🏥 Testing health endpoint...")
-    health = requests.get(f"{url}/health")
+    health = CLIENT.get(f"{url}/health")
     print(f"Health status: {health.status_code}")
+    health_data = {}
     if health.status_code == 200:
-        health_data = health.json()
+        health_data = orjson.loads(health.content)
         print(f"API Key configured: {health_data.get('api_key_configured', False)}")
         print(f"Status: {health_data.get('status', 'unknown')}")
-    
-    if health.status_code == 200 and health.json().get('api_key_configured'):
+
+    if health_data.get('api_key_configured'):
         print("\n🧪 Testing function calling...")
-        
-        # Simple function call test
-        payload = {
-            "model": "gpt-4",
-            "messages": [
-                {"role": "user", "content": "What is 25 * 4?"}
-            ],
-            "tools": [{
-                "type": "function",
-                "function": {
-                    "name": "calculate",
-                    "description": "Perform calculations",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "expression": {"type": "string", "description": "Math expression"}
-                        },
-                        "required": ["expression"]
-                    }
-                }
-            }],
-            "tool_choice": "auto"
-        }
-        
-        response = requests.post(
-            f"{url}/v1/chat/completions",
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": "Bearer test-api-key"  # Required for authentication
-            },
-            json=payload
-        )
+
+        # Simple function call test; test-api-key override required for auth
+        response = post_chat(url, CALC_BODY,
+                             headers={"Authorization": "Bearer test-api-key"})
         
         print(f"Function call test: {response.status_code}")
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             if 'choices' in data and len(data['choices']) > 0:
                 choice = data['choices'][0]
                 tool_calls = choice.get('message', {}).get('tool_calls', [])
@@ -97,7 +113,7 @@ def test_deployed_proxy():
                     print("⚠️  No function calls detected (might be normal)")
             print("🎉 Proxy is working correctly!")
         else:
-            print(f"❌ Function call failed: {response.status_code} - {response.text}")
+            print(f"❌ Function call failed: {response.status_code} - {response.content[:512].decode('utf-8', errors='replace')}")
     else:
         print("\n⚠️  API key not configured yet. Please add UPSTAGE_API_KEY to Vercel environment variables.")
         print("   1. Go to https://vercel.com/dashboard")
@@ -107,5 +123,6 @@ def test_deployed_proxy():
         print("   5. Redeploy the project")
 
 if __name__ == "__main__":
-    run_test(LOCAL_URL)
-    run_test(DEPLOYED_URL) 
\ No newline at end of file
+    # The two targets are different hosts, so probe them in parallel
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        list(executor.map(run_test, [LOCAL_URL, DEPLOYED_URL])) 
\ No newline at end of file
@@ -1,11 +1,13 @@
-import requests
-import os
-from dotenv import load_dotenv
+import http.client
+import orjson
+import sys
+import time
+from test_config import get_api_key
 
-load_dotenv('.env.local')
-API_KEY = os.getenv('UPSTAGE_API_KEY', 'sk-xxx')
+API_KEY = get_api_key()
 
-DEPLOYED_URL = "https://solar-fc-proxy.vercel.app/v1/chat/completions"
+HOST = "solar-fc-proxy.vercel.app"
+PATH = "/v1/chat/completions"
 
 headers = {
     "Content-Type": "application/json",
@@ -19,13 +21,49 @@ payload = {
 }
 
 def main():
-    print(f"Streaming from {DEPLOYED_URL} ...")
-    with requests.post(DEPLOYED_URL, headers=headers, json=payload, stream=True, timeout=60) as resp:
-        print(f"Status: {resp.status_code}")
-        for chunk in resp.iter_lines(decode_unicode=True):
-            if chunk:
-                print(chunk)
+    # Raw http.client strips the urllib3/httpx layers from the streaming
+    # hot path: the receive loop is read1 plus one C-level bytes.find per
+    # line, and the socket stays open for any follow-up request
+    print(f"Streaming from https://{HOST}{PATH} ...")
+    conn = http.client.HTTPSConnection(HOST, timeout=60)
+    try:
+        conn.request("POST", PATH, body=orjson.dumps(payload), headers=headers)
+        resp = conn.getresponse()
+        print(f"Status: {resp.status}")
+
+        # Coalesce output into batches flushed every 16 KiB or 50 ms,
+        # instead of one locked, line-flushed print per SSE line; the time
+        # trigger keeps the stream feeling live for interactive users
+        FLUSH_BYTES = 16384
+        FLUSH_INTERVAL = 0.05
+        buf = b""
+        out = bytearray()
+        write = sys.stdout.buffer.write
+        deadline = time.monotonic() + FLUSH_INTERVAL
+        while True:
+            chunk = resp.read1(8192)
+            if not chunk:
+                break
+            buf += chunk
+            while (nl := buf.find(b"\n")) >= 0:
+                line, buf = buf[:nl].rstrip(b"\r"), buf[nl + 1:]
+                if line:
+                    out += line
+                    out += b"\n"
+            if out and (len(out) > FLUSH_BYTES or time.monotonic() > deadline):
+                write(bytes(out))
+                sys.stdout.buffer.flush()
+                out.clear()
+                deadline = time.monotonic() + FLUSH_INTERVAL
+        if buf.rstrip(b"\r\n"):
+            out += buf.rstrip(b"\r\n")
+            out += b"\n"
+        if out:
+            write(bytes(out))
+        sys.stdout.buffer.flush()
         print("Stream finished.")
+    finally:
+        conn.close()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
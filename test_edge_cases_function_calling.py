@@ -4,630 +4,549 @@ Edge Cases and Boundary Conditions Test Cases for Function Calling
 This test suite covers:
 - Function chaining and sequential execution
 - Streaming with function calls
-- Large dataset processing 
+- Large dataset processing
 - Conditional parameter requirements
 - Recursive function call patterns
 - Error resilience and recovery
 - Memory and performance boundaries
 """
 
+import aiohttp
 import asyncio
+import hashlib
 import httpx
-import json
+import msgspec
+import orjson
+import os
 import time
 from datetime import datetime, timedelta
+from types import MappingProxyType
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv('.env.local')
 
-BASE_URL = "http://localhost:8000"
+# Literal loopback address: "localhost" goes through getaddrinfo (and the
+# NSS lookup chain) on every fresh connection, 127.0.0.1 does not
+BASE_URL = "http://127.0.0.1:8000"
 
-class TestEdgeCasesFunctionCalling:
-    """Edge cases and boundary condition tests for function calling"""
+# One pooled client shared by every test: connections are reused instead of
+# paying TCP+TLS setup per request, and with HTTP/2 concurrent tests
+# multiplex over a single connection where the server advertises it. The
+# keep-alive pool is sized for the concurrent __main__ runner below.
+_shared_client = None
 
-    async def test_function_chaining_sequential_execution(self):
-        """Test sequential function execution where output of one feeds into another"""
-        payload = {
-            "model": "gpt-4",
-            "messages": [
-                {
-                    "role": "user", 
-                    "content": "First get user information for ID 123, then calculate their BMI based on the returned weight and height, then provide health recommendations based on the BMI category. Execute these in sequence."
-                }
-            ],
-            "tools": [
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "get_user_info",
-                        "description": "STEP 1: Get user information by ID. Must be called first.",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "user_id": {"type": "string", "description": "User ID to look up"}
-                            },
-                            "required": ["user_id"]
-                        }
-                    }
-                },
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "calculate_bmi",
-                        "description": "STEP 2: Calculate BMI using weight and height from user info. Call after get_user_info.",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "weight": {"type": "number"},
-                                "height": {"type": "number"}
-                            },
-                            "required": ["weight", "height"]
-                        }
+async def get_client() -> httpx.AsyncClient:
+    """Return the shared module-level HTTP client, creating it on first use"""
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = httpx.AsyncClient(
+            base_url=BASE_URL,
+            http2=True,
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=32)
+        )
+    return _shared_client
+
+async def close_client():
+    """Close the shared client once all tests are done"""
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.aclose()
+        _shared_client = None
+
+# aiohttp handles the streaming test: its BufferedProtocol receive path
+# fills a preallocated buffer and iter_chunks yields slices of it, one
+# copy fewer per frame than decoding through the httpx stream API. The
+# session is shared so its connector is set up once.
+_aiohttp_session = None
+
+async def get_aiohttp_session() -> aiohttp.ClientSession:
+    """Return the shared aiohttp session, creating it on first use"""
+    global _aiohttp_session
+    if _aiohttp_session is None:
+        _aiohttp_session = aiohttp.ClientSession(
+            base_url=BASE_URL,
+            timeout=aiohttp.ClientTimeout(total=30),
+            connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300)
+        )
+    return _aiohttp_session
+
+async def close_aiohttp_session():
+    """Close the shared aiohttp session once all tests are done"""
+    global _aiohttp_session
+    if _aiohttp_session is not None:
+        await _aiohttp_session.close()
+        _aiohttp_session = None
+
+# The large-dataset test only ever sends the first 10 rows of a nominal
+# 100-item dataset, so build just those rows (reusing interned category
+# strings instead of an f-string per row) and carry the full size as a count
+_DATASET_CATEGORIES = ("cat_0", "cat_1", "cat_2", "cat_3", "cat_4")
+large_dataset_sample = [
+    {"id": i, "value": i * 2, "category": _DATASET_CATEGORIES[i % 5]}
+    for i in range(10)
+]
+LARGE_DATASET_TOTAL = 100
+
+# The very-long-parameter prompt only embeds the first 200 characters of
+# the long text, so build exactly that prefix (8 repeats clears 200 chars)
+# instead of a 2700-character string that is mostly thrown away
+_LONG_PREFIX_200 = ("This is a very long text. " * 8)[:200]
+
+# Keys shared by every payload live in one read-only base mapping that each
+# payload spreads in, so the common skeleton is defined (and changed) in
+# exactly one place; MappingProxyType catches accidental mutation
+_BASE = MappingProxyType({"model": "gpt-4"})
+
+# Every payload in this suite is fixed, so the nested dicts are built once
+# at import instead of on every test call, then serialized to bytes exactly
+# once below. Tests post the precomputed bytes via content= so no JSON
+# encoding happens on the request hot path.
+_PAYLOADS = {
+    "chain": {
+        **_BASE,
+        "messages": [
+            {
+                "role": "user",
+                "content": "First get user information for ID 123, then calculate their BMI based on the returned weight and height, then provide health recommendations based on the BMI category. Execute these in sequence."
+            }
+        ],
+        "tools": [
+            {
+                "type": "function",
+                "function": {
+                    "name": "get_user_info",
+                    "description": "STEP 1: Get user information by ID. Must be called first.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "user_id": {"type": "string", "description": "User ID to look up"}
+                        },
+                        "required": ["user_id"]
                     }
-                },
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "health_recommendations",
-                        "description": "STEP 3: Provide health recommendations based on BMI category. Call after calculate_bmi.",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "bmi": {"type": "number"},
-                                "category": {"type": "string", "enum": ["underweight", "normal", "overweight", "obese"]}
-                            },
-                            "required": ["bmi", "category"]
-                        }
+                }
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "calculate_bmi",
+                    "description": "STEP 2: Calculate BMI using weight and height from user info. Call after get_user_info.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "weight": {"type": "number"},
+                            "height": {"type": "number"}
+                        },
+                        "required": ["weight", "height"]
                     }
                 }
-            ],
-            "tool_choice": "required",
-            "max_tokens": 1500
-        }
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(f"{BASE_URL}/v1/chat/completions", json=payload)
-            assert response.status_code == 200
-            
-            data = response.json()
-            choice = data["choices"][0]
-            message = choice["message"]
-            
-            if "tool_calls" in message:
-                tool_calls = message["tool_calls"]
-                function_names = [tc["function"]["name"] for tc in tool_calls]
-                print(f"Function call sequence: {function_names}")
-                
-                # Check if we got the expected function (should start with get_user_info)
-                assert len(tool_calls) >= 1
-                assert tool_calls[0]["function"]["name"] == "get_user_info"
-
-    async def test_streaming_with_function_calls(self):
-        """Test streaming response with function calls"""
-        payload = {
-            "model": "gpt-4",
-            "messages": [
-                {
-                    "role": "user",
-                    "content": "Get the current time and explain what it means."
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "health_recommendations",
+                    "description": "STEP 3: Provide health recommendations based on BMI category. Call after calculate_bmi.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "bmi": {"type": "number"},
+                            "category": {"type": "string", "enum": ["underweight", "normal", "overweight", "obese"]}
+                        },
+                        "required": ["bmi", "category"]
+                    }
                 }
-            ],
-            "tools": [
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "get_current_time",
-                        "description": "Get the current time",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "format": {
-                                    "type": "string",
-                                    "enum": ["iso", "timestamp", "human"],
-                                    "default": "human"
-                                }
+            }
+        ],
+        "tool_choice": "required",
+        "max_tokens": 1500
+    },
+    "streaming": {
+        **_BASE,
+        "messages": [
+            {
+                "role": "user",
+                "content": "Get the current time and explain what it means."
+            }
+        ],
+        "tools": [
+            {
+                "type": "function",
+                "function": {
+                    "name": "get_current_time",
+                    "description": "Get the current time",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "format": {
+                                "type": "string",
+                                "enum": ["iso", "timestamp", "human"],
+                                "default": "human"
                             }
                         }
                     }
                 }
-            ],
-            "tool_choice": "auto",
-            "stream": True,
-            "max_tokens": 800
-        }
-
-        async with httpx.AsyncClient() as client:
-            async with client.stream("POST", f"{BASE_URL}/v1/chat/completions", json=payload) as response:
-                assert response.status_code == 200
-                
-                chunks = []
-                async for chunk in response.aiter_text():
-                    if chunk.strip():
-                        chunks.append(chunk)
-                
-                print(f"Received {len(chunks)} streaming chunks")
-                assert len(chunks) > 0
-
-    async def test_large_dataset_processing(self):
-        """Test function calls with large datasets and batch processing"""
-        # Generate a large dataset
-        large_dataset = [
-            {"id": i, "value": i * 2, "category": f"cat_{i % 5}"}
-            for i in range(100)
-        ]
-        
-        payload = {
-            "model": "gpt-4",
-            "messages": [
-                {
-                    "role": "user",
-                    "content": f"Process this dataset and calculate statistics: {json.dumps(large_dataset[:10])}... (truncated, total {len(large_dataset)} items)"
-                }
-            ],
-            "tools": [
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "calculate_statistics",
-                        "description": "Calculate statistics for a dataset",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "operation": {
-                                    "type": "string",
-                                    "enum": ["mean", "median", "sum", "count", "std_dev"],
-                                    "description": "Statistical operation to perform"
-                                },
-                                "field": {
-                                    "type": "string",
-                                    "description": "Field to calculate statistics for"
-                                },
-                                "filter_category": {
-                                    "type": "string",
-                                    "description": "Optional category to filter by"
-                                }
+            }
+        ],
+        "tool_choice": "auto",
+        "stream": True,
+        "max_tokens": 800
+    },
+    "large_dataset": {
+        **_BASE,
+        "messages": [
+            {
+                "role": "user",
+                "content": f"Process this dataset and calculate statistics: {orjson.dumps(large_dataset_sample).decode()}... (truncated, total {LARGE_DATASET_TOTAL} items)"
+            }
+        ],
+        "tools": [
+            {
+                "type": "function",
+                "function": {
+                    "name": "calculate_statistics",
+                    "description": "Calculate statistics for a dataset",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "operation": {
+                                "type": "string",
+                                "enum": ["mean", "median", "sum", "count", "std_dev"],
+                                "description": "Statistical operation to perform"
                             },
-                            "required": ["operation", "field"]
-                        }
+                            "field": {
+                                "type": "string",
+                                "description": "Field to calculate statistics for"
+                            },
+                            "filter_category": {
+                                "type": "string",
+                                "description": "Optional category to filter by"
+                            }
+                        },
+                        "required": ["operation", "field"]
                     }
                 }
-            ],
-            "tool_choice": "auto",
-            "max_tokens": 1000
-        }
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(f"{BASE_URL}/v1/chat/completions", json=payload)
-            assert response.status_code == 200
-            
-            data = response.json()
-            print(f"Large dataset processing response: {data}")
-
-    async def test_function_with_conditional_parameters(self):
-        """Test function calls with conditional parameter requirements"""
-        payload = {
-            "model": "gpt-4",
-            "messages": [
-                {
-                    "role": "user",
-                    "content": "Book a flight from New York to London for tomorrow, business class, with meal preference for vegetarian."
-                }
-            ],
-            "tools": [
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "book_flight",
-                        "description": "Book a flight with various options",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "origin": {"type": "string"},
-                                "destination": {"type": "string"},
-                                "departure_date": {"type": "string", "format": "date"},
-                                "return_date": {"type": "string", "format": "date"},
-                                "class": {
-                                    "type": "string",
-                                    "enum": ["economy", "premium_economy", "business", "first"]
-                                },
-                                "passengers": {
-                                    "type": "integer",
-                                    "minimum": 1,
-                                    "maximum": 9,
-                                    "default": 1
-                                },
-                                "meal_preference": {
-                                    "type": "string",
-                                    "enum": ["none", "vegetarian", "vegan", "halal", "kosher", "gluten_free"]
-                                },
-                                "seat_preference": {
-                                    "type": "string",
-                                    "enum": ["window", "aisle", "middle", "any"]
-                                }
+            }
+        ],
+        "tool_choice": "auto",
+        "max_tokens": 1000
+    },
+    "conditional": {
+        **_BASE,
+        "messages": [
+            {
+                "role": "user",
+                "content": "Book a flight from New York to London for tomorrow, business class, with meal preference for vegetarian."
+            }
+        ],
+        "tools": [
+            {
+                "type": "function",
+                "function": {
+                    "name": "book_flight",
+                    "description": "Book a flight with various options",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "origin": {"type": "string"},
+                            "destination": {"type": "string"},
+                            "departure_date": {"type": "string", "format": "date"},
+                            "return_date": {"type": "string", "format": "date"},
+                            "class": {
+                                "type": "string",
+                                "enum": ["economy", "premium_economy", "business", "first"]
                             },
-                            "required": ["origin", "destination", "departure_date"]
-                        }
+                            "passengers": {
+                                "type": "integer",
+                                "minimum": 1,
+                                "maximum": 9,
+                                "default": 1
+                            },
+                            "meal_preference": {
+                                "type": "string",
+                                "enum": ["none", "vegetarian", "vegan", "halal", "kosher", "gluten_free"]
+                            },
+                            "seat_preference": {
+                                "type": "string",
+                                "enum": ["window", "aisle", "middle", "any"]
+                            }
+                        },
+                        "required": ["origin", "destination", "departure_date"]
                     }
                 }
-            ],
-            "tool_choice": "required",
-            "max_tokens": 800
-        }
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(f"{BASE_URL}/v1/chat/completions", json=payload)
-            assert response.status_code == 200
-            
-            data = response.json()
-            choice = data["choices"][0]
-            message = choice["message"]
-            
-            assert "tool_calls" in message
-            tool_call = message["tool_calls"][0]
-            args = json.loads(tool_call["function"]["arguments"])
-            
-            # Should include meal preference for business class
-            if args.get("class") in ["business", "first"]:
-                print(f"Business/First class booking includes meal preference")
-            
-            print(f"Flight booking: {args}")
-
-    async def test_recursive_function_calls(self):
-        """Test recursive or iterative function calling patterns"""
-        payload = {
-            "model": "gpt-4",
-            "messages": [
-                {
-                    "role": "user",
-                    "content": "Search for information about 'artificial intelligence' and then search for related topics based on the first results."
-                }
-            ],
-            "tools": [
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "search_information",
-                        "description": "Search for information on a topic",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "query": {"type": "string"},
-                                "depth": {
-                                    "type": "integer",
-                                    "minimum": 1,
-                                    "maximum": 3,
-                                    "description": "Search depth level"
-                                },
-                                "related_topics": {
-                                    "type": "array",
-                                    "items": {"type": "string"},
-                                    "description": "Related topics to explore"
-                                }
+            }
+        ],
+        "tool_choice": "required",
+        "max_tokens": 800
+    },
+    "recursive": {
+        **_BASE,
+        "messages": [
+            {
+                "role": "user",
+                "content": "Search for information about 'artificial intelligence' and then search for related topics based on the first results."
+            }
+        ],
+        "tools": [
+            {
+                "type": "function",
+                "function": {
+                    "name": "search_information",
+                    "description": "Search for information on a topic",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "query": {"type": "string"},
+                            "depth": {
+                                "type": "integer",
+                                "minimum": 1,
+                                "maximum": 3,
+                                "description": "Search depth level"
                             },
-                            "required": ["query"]
-                        }
+                            "related_topics": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "Related topics to explore"
+                            }
+                        },
+                        "required": ["query"]
                     }
                 }
-            ],
-            "tool_choice": "auto",
-            "max_tokens": 1200
-        }
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(f"{BASE_URL}/v1/chat/completions", json=payload)
-            assert response.status_code == 200
-            
-            data = response.json()
-            choice = data["choices"][0]
-            message = choice["message"]
-            
-            print(f"Recursive search response: {message}")
-
-    async def test_malformed_json_in_function_arguments(self):
-        """Test handling of malformed JSON in function arguments"""
-        payload = {
-            "model": "gpt-4",
-            "messages": [
-                {
-                    "role": "user",
-                    "content": "Create a really complex nested structure with lots of special characters, quotes, and weird formatting."
-                }
-            ],
-            "tools": [
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "process_complex_data",
-                        "description": "Process complex structured data",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "data": {
-                                    "type": "object",
-                                    "description": "Complex data structure"
-                                },
-                                "special_chars": {
-                                    "type": "string",
-                                    "description": "String with special characters"
-                                }
+            }
+        ],
+        "tool_choice": "auto",
+        "max_tokens": 1200
+    },
+    "malformed": {
+        **_BASE,
+        "messages": [
+            {
+                "role": "user",
+                "content": "Create a really complex nested structure with lots of special characters, quotes, and weird formatting."
+            }
+        ],
+        "tools": [
+            {
+                "type": "function",
+                "function": {
+                    "name": "process_complex_data",
+                    "description": "Process complex structured data",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "data": {
+                                "type": "object",
+                                "description": "Complex data structure"
                             },
-                            "required": ["data"]
-                        }
+                            "special_chars": {
+                                "type": "string",
+                                "description": "String with special characters"
+                            }
+                        },
+                        "required": ["data"]
                     }
                 }
-            ],
-            "tool_choice": "required",
-            "max_tokens": 800
-        }
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(f"{BASE_URL}/v1/chat/completions", json=payload)
-            assert response.status_code == 200
-            
-            data = response.json()
-            choice = data["choices"][0]
-            
-            # Should handle malformed JSON gracefully
-            print(f"Complex data processing response: {choice}")
-
-    async def test_empty_and_null_parameters(self):
-        """Test handling of empty and null parameters"""
-        payload = {
-            "model": "gpt-4",
-            "messages": [
-                {
-                    "role": "user",
-                    "content": "Process an empty dataset or null values."
-                }
-            ],
-            "tools": [
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "handle_empty_data",
-                        "description": "Handle empty or null data",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "data": {
-                                    "type": "array",
-                                    "items": {"type": "string"},
-                                    "description": "Array that might be empty"
-                                },
-                                "nullable_field": {
-                                    "type": "string",
-                                    "description": "Field that can be null"
-                                },
-                                "optional_field": {
-                                    "type": "string",
-                                    "description": "Optional field"
-                                }
+            }
+        ],
+        "tool_choice": "required",
+        "max_tokens": 800
+    },
+    "empty_null": {
+        **_BASE,
+        "messages": [
+            {
+                "role": "user",
+                "content": "Process an empty dataset or null values."
+            }
+        ],
+        "tools": [
+            {
+                "type": "function",
+                "function": {
+                    "name": "handle_empty_data",
+                    "description": "Handle empty or null data",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "data": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "Array that might be empty"
                             },
-                            "required": ["data"]
-                        }
+                            "nullable_field": {
+                                "type": "string",
+                                "description": "Field that can be null"
+                            },
+                            "optional_field": {
+                                "type": "string",
+                                "description": "Optional field"
+                            }
+                        },
+                        "required": ["data"]
                     }
                 }
-            ],
-            "tool_choice": "required",
-            "max_tokens": 500
-        }
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(f"{BASE_URL}/v1/chat/completions", json=payload)
-            assert response.status_code == 200
-            
-            data = response.json()
-            choice = data["choices"][0]
-            message = choice["message"]
-            
-            if "tool_calls" in message:
-                tool_call = message["tool_calls"][0]
-                args = json.loads(tool_call["function"]["arguments"])
-                print(f"Empty data handling: {args}")
-
-    async def test_unicode_and_special_characters(self):
-        """Test handling of Unicode and special characters in function parameters"""
-        payload = {
-            "model": "gpt-4",
-            "messages": [
-                {
-                    "role": "user",
-                    "content": "Process text with emojis 🚀, Chinese characters 你好, Arabic العربية, and special symbols ∫∑∆."
-                }
-            ],
-            "tools": [
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "process_unicode_text",
-                        "description": "Process text with Unicode characters",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "text": {
-                                    "type": "string",
-                                    "description": "Text with Unicode characters"
-                                },
-                                "language": {
-                                    "type": "string",
-                                    "enum": ["en", "zh", "ar", "mixed"],
-                                    "description": "Primary language"
-                                },
-                                "contains_emojis": {
-                                    "type": "boolean",
-                                    "description": "Whether text contains emojis"
-                                }
+            }
+        ],
+        "tool_choice": "required",
+        "max_tokens": 500
+    },
+    "unicode": {
+        **_BASE,
+        "messages": [
+            {
+                "role": "user",
+                "content": "Process text with emojis 🚀, Chinese characters 你好, Arabic العربية, and special symbols ∫∑∆."
+            }
+        ],
+        "tools": [
+            {
+                "type": "function",
+                "function": {
+                    "name": "process_unicode_text",
+                    "description": "Process text with Unicode characters",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "text": {
+                                "type": "string",
+                                "description": "Text with Unicode characters"
                             },
-                            "required": ["text"]
-                        }
+                            "language": {
+                                "type": "string",
+                                "enum": ["en", "zh", "ar", "mixed"],
+                                "description": "Primary language"
+                            },
+                            "contains_emojis": {
+                                "type": "boolean",
+                                "description": "Whether text contains emojis"
+                            }
+                        },
+                        "required": ["text"]
                     }
                 }
-            ],
-            "tool_choice": "required",
-            "max_tokens": 600
-        }
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(f"{BASE_URL}/v1/chat/completions", json=payload)
-            assert response.status_code == 200
-            
-            data = response.json()
-            choice = data["choices"][0]
-            message = choice["message"]
-            
-            if "tool_calls" in message:
-                tool_call = message["tool_calls"][0]
-                args = json.loads(tool_call["function"]["arguments"])
-                print(f"Unicode text processing: {args}")
-
-    async def test_very_long_parameter_strings(self):
-        """Test handling of very long strings in parameters"""
-        long_text = "This is a very long text. " * 100  # 2700 characters
-        
-        payload = {
-            "model": "gpt-4",
-            "messages": [
-                {
-                    "role": "user",
-                    "content": f"Summarize this very long text: {long_text[:200]}... (truncated)"
-                }
-            ],
-            "tools": [
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "summarize_long_text",
-                        "description": "Summarize very long text",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "text": {
-                                    "type": "string",
-                                    "description": "Long text to summarize"
-                                },
-                                "max_length": {
-                                    "type": "integer",
-                                    "minimum": 50,
-                                    "maximum": 500,
-                                    "description": "Maximum summary length"
-                                }
+            }
+        ],
+        "tool_choice": "required",
+        "max_tokens": 600
+    },
+    "long_text": {
+        **_BASE,
+        "messages": [
+            {
+                "role": "user",
+                "content": f"Summarize this very long text: {_LONG_PREFIX_200}... (truncated)"
+            }
+        ],
+        "tools": [
+            {
+                "type": "function",
+                "function": {
+                    "name": "summarize_long_text",
+                    "description": "Summarize very long text",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "text": {
+                                "type": "string",
+                                "description": "Long text to summarize"
                             },
-                            "required": ["text"]
-                        }
+                            "max_length": {
+                                "type": "integer",
+                                "minimum": 50,
+                                "maximum": 500,
+                                "description": "Maximum summary length"
+                            }
+                        },
+                        "required": ["text"]
                     }
                 }
-            ],
-            "tool_choice": "required",
-            "max_tokens": 1000
-        }
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(f"{BASE_URL}/v1/chat/completions", json=payload)
-            assert response.status_code == 200
-            
-            data = response.json()
-            choice = data["choices"][0]
-            
-            print(f"Long text processing response: {choice}")
-
-    async def test_timeout_and_retry_scenarios(self):
-        """Test timeout and retry scenarios with function calls"""
-        payload = {
-            "model": "gpt-4",
-            "messages": [
-                {
-                    "role": "user",
-                    "content": "Perform a network operation that might timeout or fail."
-                }
-            ],
-            "tools": [
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "network_operation",
-                        "description": "Perform a network operation with timeout",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "url": {"type": "string", "format": "uri"},
-                                "timeout": {
-                                    "type": "integer",
-                                    "minimum": 1,
-                                    "maximum": 60,
-                                    "description": "Timeout in seconds"
-                                },
-                                "retry_count": {
-                                    "type": "integer",
-                                    "minimum": 0,
-                                    "maximum": 3,
-                                    "description": "Number of retries"
-                                }
+            }
+        ],
+        "tool_choice": "required",
+        "max_tokens": 1000
+    },
+    "timeout": {
+        **_BASE,
+        "messages": [
+            {
+                "role": "user",
+                "content": "Perform a network operation that might timeout or fail."
+            }
+        ],
+        "tools": [
+            {
+                "type": "function",
+                "function": {
+                    "name": "network_operation",
+                    "description": "Perform a network operation with timeout",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "url": {"type": "string", "format": "uri"},
+                            "timeout": {
+                                "type": "integer",
+                                "minimum": 1,
+                                "maximum": 60,
+                                "description": "Timeout in seconds"
                             },
-                            "required": ["url"]
-                        }
+                            "retry_count": {
+                                "type": "integer",
+                                "minimum": 0,
+                                "maximum": 3,
+                                "description": "Number of retries"
+                            }
+                        },
+                        "required": ["url"]
                     }
                 }
-            ],
-            "tool_choice": "required",
-            "max_tokens": 500
-        }
-
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(f"{BASE_URL}/v1/chat/completions", json=payload)
-            assert response.status_code == 200
-            
-            data = response.json()
-            choice = data["choices"][0]
-            
-            print(f"Network operation response: {choice}")
-
-    async def test_extremely_nested_parameters(self):
-        """Test extremely nested parameter structures"""
-        payload = {
-            "model": "gpt-4",
-            "messages": [
-                {
-                    "role": "user",
-                    "content": "Create a deeply nested organizational structure with departments, teams, employees, and their relationships."
-                }
-            ],
-            "tools": [
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "create_org_structure",
-                        "description": "Create organizational structure",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "organization": {
-                                    "type": "object",
-                                    "properties": {
-                                        "name": {"type": "string"},
-                                        "departments": {
-                                            "type": "array",
-                                            "items": {
-                                                "type": "object",
-                                                "properties": {
-                                                    "name": {"type": "string"},
-                                                    "teams": {
-                                                        "type": "array",
-                                                        "items": {
-                                                            "type": "object",
-                                                            "properties": {
-                                                                "name": {"type": "string"},
-                                                                "members": {
-                                                                    "type": "array",
-                                                                    "items": {
-                                                                        "type": "object",
-                                                                        "properties": {
-                                                                            "name": {"type": "string"},
-                                                                            "role": {"type": "string"},
-                                                                            "skills": {
-                                                                                "type": "array",
-                                                                                "items": {"type": "string"}
-                                                                            }
+            }
+        ],
+        "tool_choice": "required",
+        "max_tokens": 500
+    },
+    "nested_org": {
+        **_BASE,
+        "messages": [
+            {
+                "role": "user",
+                "content": "Create a deeply nested organizational structure with departments, teams, employees, and their relationships."
+            }
+        ],
+        "tools": [
+            {
+                "type": "function",
+                "function": {
+                    "name": "create_org_structure",
+                    "description": "Create organizational structure",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "organization": {
+                                "type": "object",
+                                "properties": {
+                                    "name": {"type": "string"},
+                                    "departments": {
+                                        "type": "array",
+                                        "items": {
+                                            "type": "object",
+                                            "properties": {
+                                                "name": {"type": "string"},
+                                                "teams": {
+                                                    "type": "array",
+                                                    "items": {
+                                                        "type": "object",
+                                                        "properties": {
+                                                            "name": {"type": "string"},
+                                                            "members": {
+                                                                "type": "array",
+                                                                "items": {
+                                                                    "type": "object",
+                                                                    "properties": {
+                                                                        "name": {"type": "string"},
+                                                                        "role": {"type": "string"},
+                                                                        "skills": {
+                                                                            "type": "array",
+                                                                            "items": {"type": "string"}
                                                                         }
                                                                     }
                                                                 }
@@ -637,70 +556,297 @@ class TestEdgeCasesFunctionCalling:
                                                 }
                                             }
                                         }
-                                    },
-                                    "required": ["name"]
-                                }
-                            },
-                            "required": ["organization"]
-                        }
+                                    }
+                                },
+                                "required": ["name"]
+                            }
+                        },
+                        "required": ["organization"]
                     }
                 }
-            ],
-            "tool_choice": "required",
-            "max_tokens": 1500
-        }
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(f"{BASE_URL}/v1/chat/completions", json=payload)
-            assert response.status_code == 200
-            
-            data = response.json()
-            choice = data["choices"][0]
-            message = choice["message"]
-            
-            if "tool_calls" in message:
-                tool_call = message["tool_calls"][0]
-                args = json.loads(tool_call["function"]["arguments"])
-                print(f"Deeply nested structure created: {len(json.dumps(args))} characters")
+            }
+        ],
+        "tool_choice": "required",
+        "max_tokens": 1500
+    },
+}
+
+_JSON_HEADERS = {"content-type": "application/json"}
+
+# Serialize each payload to bytes exactly once at import
+_BODIES = {name: orjson.dumps(p) for name, p in _PAYLOADS.items()}
+
+# Typed response decoding: msgspec parses the response bytes straight into
+# these structs in C, skipping the intermediate dict tree and replacing
+# chained dict indexing with attribute access in the assertions. Fields not
+# declared here are ignored.
+class _Function(msgspec.Struct):
+    name: str
+    arguments: str
+
+class _ToolCall(msgspec.Struct):
+    function: _Function
+
+class _Message(msgspec.Struct):
+    content: str | None = None
+    tool_calls: list[_ToolCall] | None = None
+
+class _Choice(msgspec.Struct):
+    message: _Message
+
+class _ChatCompletion(msgspec.Struct):
+    choices: list[_Choice]
+
+_RESPONSE_DECODER = msgspec.json.Decoder(_ChatCompletion)
+_ARGS_DECODER = msgspec.json.Decoder(dict)
+
+# Optional response memoization for repeated dev/CI runs: the payloads are
+# fixed, so identical bodies produce one proxy (and LLM) round trip per
+# process. Keyed by a 16-byte blake2b digest of the request bytes; opt-in
+# via PROXY_TEST_CACHE=1 so live runs still exercise the proxy every time.
+# Streaming requests bypass it (the stream is consumed, not stored).
+_CACHE_ENABLED = os.getenv("PROXY_TEST_CACHE") == "1"
+_CACHE = {}
+
+async def cached_post(client, url, *, content, headers):
+    """POST precomputed bytes, memoizing the response when the cache is on"""
+    if not _CACHE_ENABLED:
+        return await client.post(url, content=content, headers=headers)
+    key = hashlib.blake2b(content, digest_size=16).digest()
+    response = _CACHE.get(key)
+    if response is None:
+        response = await client.post(url, content=content, headers=headers)
+        _CACHE[key] = response
+    return response
+
+class TestEdgeCasesFunctionCalling:
+    """Edge cases and boundary condition tests for function calling"""
+
+    async def test_function_chaining_sequential_execution(self):
+        """Test sequential function execution where output of one feeds into another"""
+        client = await get_client()
+        response = await cached_post(client, "/v1/chat/completions",
+                                     content=_BODIES["chain"], headers=_JSON_HEADERS)
+        assert response.status_code == 200
+
+        data = _RESPONSE_DECODER.decode(response.content)
+        choice = data.choices[0]
+        message = choice.message
+
+        if message.tool_calls:
+            tool_calls = message.tool_calls
+            function_names = [tc.function.name for tc in tool_calls]
+            print(f"Function call sequence: {function_names}")
+
+            # Check if we got the expected function (should start with get_user_info)
+            assert len(tool_calls) >= 1
+            assert tool_calls[0].function.name == "get_user_info"
+
+    async def test_streaming_with_function_calls(self):
+        """Test streaming response with function calls"""
+        session = await get_aiohttp_session()
+        async with session.post("/v1/chat/completions",
+                                data=_BODIES["streaming"], headers=_JSON_HEADERS) as response:
+            assert response.status == 200
+
+            # Count SSE frame delimiters with a C-level bytes.count scan
+            # per buffer instead of splitting and stripping lines in
+            # Python. A delimiter can straddle a buffer boundary, which
+            # undercounts by at most one per boundary; the assertion only
+            # needs frames to have arrived at all.
+            event_count = 0
+            async for buf, _ in response.content.iter_chunks():
+                if buf:
+                    event_count += buf.count(b"\n\n")
+
+            print(f"Received {event_count} streaming events")
+            assert event_count > 0
+
+    async def test_large_dataset_processing(self):
+        """Test function calls with large datasets and batch processing"""
+        client = await get_client()
+        response = await cached_post(client, "/v1/chat/completions",
+                                     content=_BODIES["large_dataset"], headers=_JSON_HEADERS)
+        assert response.status_code == 200
+
+        data = _RESPONSE_DECODER.decode(response.content)
+        print(f"Large dataset processing response: {data}")
+
+    async def test_function_with_conditional_parameters(self):
+        """Test function calls with conditional parameter requirements"""
+        client = await get_client()
+        response = await cached_post(client, "/v1/chat/completions",
+                                     content=_BODIES["conditional"], headers=_JSON_HEADERS)
+        assert response.status_code == 200
+
+        data = _RESPONSE_DECODER.decode(response.content)
+        choice = data.choices[0]
+        message = choice.message
+
+        assert message.tool_calls
+        tool_call = message.tool_calls[0]
+        args = _ARGS_DECODER.decode(tool_call.function.arguments)
+
+        # Should include meal preference for business class
+        if args.get("class") in ["business", "first"]:
+            print(f"Business/First class booking includes meal preference")
+
+        print(f"Flight booking: {args}")
+
+    async def test_recursive_function_calls(self):
+        """Test recursive or iterative function calling patterns"""
+        client = await get_client()
+        response = await cached_post(client, "/v1/chat/completions",
+                                     content=_BODIES["recursive"], headers=_JSON_HEADERS)
+        assert response.status_code == 200
+
+        data = _RESPONSE_DECODER.decode(response.content)
+        choice = data.choices[0]
+        message = choice.message
+
+        print(f"Recursive search response: {message}")
+
+    async def test_malformed_json_in_function_arguments(self):
+        """Test handling of malformed JSON in function arguments"""
+        client = await get_client()
+        response = await cached_post(client, "/v1/chat/completions",
+                                     content=_BODIES["malformed"], headers=_JSON_HEADERS)
+        assert response.status_code == 200
+
+        data = _RESPONSE_DECODER.decode(response.content)
+        choice = data.choices[0]
+
+        # Should handle malformed JSON gracefully
+        print(f"Complex data processing response: {choice}")
+
+    async def test_empty_and_null_parameters(self):
+        """Test handling of empty and null parameters"""
+        client = await get_client()
+        response = await cached_post(client, "/v1/chat/completions",
+                                     content=_BODIES["empty_null"], headers=_JSON_HEADERS)
+        assert response.status_code == 200
+
+        data = _RESPONSE_DECODER.decode(response.content)
+        choice = data.choices[0]
+        message = choice.message
+
+        if message.tool_calls:
+            tool_call = message.tool_calls[0]
+            args = _ARGS_DECODER.decode(tool_call.function.arguments)
+            print(f"Empty data handling: {args}")
+
+    async def test_unicode_and_special_characters(self):
+        """Test handling of Unicode and special characters in function parameters"""
+        client = await get_client()
+        response = await cached_post(client, "/v1/chat/completions",
+                                     content=_BODIES["unicode"], headers=_JSON_HEADERS)
+        assert response.status_code == 200
+
+        data = _RESPONSE_DECODER.decode(response.content)
+        choice = data.choices[0]
+        message = choice.message
+
+        if message.tool_calls:
+            tool_call = message.tool_calls[0]
+            args = _ARGS_DECODER.decode(tool_call.function.arguments)
+            print(f"Unicode text processing: {args}")
+
+    async def test_very_long_parameter_strings(self):
+        """Test handling of very long strings in parameters"""
+        client = await get_client()
+        response = await cached_post(client, "/v1/chat/completions",
+                                     content=_BODIES["long_text"], headers=_JSON_HEADERS)
+        assert response.status_code == 200
+
+        data = _RESPONSE_DECODER.decode(response.content)
+        choice = data.choices[0]
+
+        print(f"Long text processing response: {choice}")
+
+    async def test_timeout_and_retry_scenarios(self):
+        """Test timeout and retry scenarios with function calls"""
+        client = await get_client()
+        response = await cached_post(client, "/v1/chat/completions",
+                                     content=_BODIES["timeout"], headers=_JSON_HEADERS)
+        assert response.status_code == 200
+
+        data = _RESPONSE_DECODER.decode(response.content)
+        choice = data.choices[0]
+
+        print(f"Network operation response: {choice}")
+
+    async def test_extremely_nested_parameters(self):
+        """Test extremely nested parameter structures"""
+        client = await get_client()
+        response = await cached_post(client, "/v1/chat/completions",
+                                     content=_BODIES["nested_org"], headers=_JSON_HEADERS)
+        assert response.status_code == 200
+
+        data = _RESPONSE_DECODER.decode(response.content)
+        choice = data.choices[0]
+        message = choice.message
+
+        if message.tool_calls:
+            tool_call = message.tool_calls[0]
+            args = _ARGS_DECODER.decode(tool_call.function.arguments)
+            print(f"Deeply nested structure created: {len(orjson.dumps(args))} characters")
+
+# Name → test-method table: the single dispatch point for the runner
+# below, and the parametrization point if this suite ever runs under
+# pytest-asyncio (parametrize over this table; pytest-xdist can then fan
+# the rows out across worker processes)
+EDGE_CASE_TESTS = (
+    ("Function Chaining", TestEdgeCasesFunctionCalling.test_function_chaining_sequential_execution),
+    ("Streaming with Function Calls", TestEdgeCasesFunctionCalling.test_streaming_with_function_calls),
+    ("Large Dataset Processing", TestEdgeCasesFunctionCalling.test_large_dataset_processing),
+    ("Conditional Parameters", TestEdgeCasesFunctionCalling.test_function_with_conditional_parameters),
+    ("Recursive Function Calls", TestEdgeCasesFunctionCalling.test_recursive_function_calls),
+    ("Malformed JSON Handling", TestEdgeCasesFunctionCalling.test_malformed_json_in_function_arguments),
+    ("Empty/Null Parameters", TestEdgeCasesFunctionCalling.test_empty_and_null_parameters),
+    ("Unicode Characters", TestEdgeCasesFunctionCalling.test_unicode_and_special_characters),
+    ("Very Long Parameters", TestEdgeCasesFunctionCalling.test_very_long_parameter_strings),
+    ("Timeout Scenarios", TestEdgeCasesFunctionCalling.test_timeout_and_retry_scenarios),
+    ("Extremely Nested Parameters", TestEdgeCasesFunctionCalling.test_extremely_nested_parameters),
+)
 
 if __name__ == "__main__":
     async def run_edge_case_tests():
         test_instance = TestEdgeCasesFunctionCalling()
-        
-        print("=== Testing Function Chaining ===")
-        await test_instance.test_function_chaining_sequential_execution()
-        
-        print("\n=== Testing Streaming with Function Calls ===")
-        await test_instance.test_streaming_with_function_calls()
-        
-        print("\n=== Testing Large Dataset Processing ===")
-        await test_instance.test_large_dataset_processing()
-        
-        print("\n=== Testing Conditional Parameters ===")
-        await test_instance.test_function_with_conditional_parameters()
-        
-        print("\n=== Testing Recursive Function Calls ===")
-        await test_instance.test_recursive_function_calls()
-        
-        print("\n=== Testing Malformed JSON Handling ===")
-        await test_instance.test_malformed_json_in_function_arguments()
-        
-        print("\n=== Testing Empty/Null Parameters ===")
-        await test_instance.test_empty_and_null_parameters()
-        
-        print("\n=== Testing Unicode Characters ===")
-        await test_instance.test_unicode_and_special_characters()
-        
-        print("\n=== Testing Very Long Parameters ===")
-        await test_instance.test_very_long_parameter_strings()
-        
-        print("\n=== Testing Timeout Scenarios ===")
-        await test_instance.test_timeout_and_retry_scenarios()
-        
-        print("\n=== Testing Extremely Nested Parameters ===")
-        await test_instance.test_extremely_nested_parameters()
-        
+
+        # The tests are independent requests, so run them concurrently; a
+        # semaphore caps in-flight requests at 4 so the proxy isn't hit
+        # with all eleven at once. Results are reported in the original
+        # order afterwards so the output stays readable.
+        semaphore = asyncio.Semaphore(4)
+
+        async def bounded(test):
+            async with semaphore:
+                return await test(test_instance)
+
+        print(f"=== Running {len(EDGE_CASE_TESTS)} edge case tests concurrently (max 4 in flight) ===")
+        results = await asyncio.gather(
+            *(bounded(test) for _, test in EDGE_CASE_TESTS), return_exceptions=True
+        )
+
+        failures = 0
+        for (name, _), result in zip(EDGE_CASE_TESTS, results):
+            if isinstance(result, BaseException):
+                failures += 1
+                print(f"❌ {name}: {result!r}")
+            else:
+                print(f"✅ {name}")
+
+        if failures:
+            print(f"\n❌ {failures} edge case test(s) failed")
+            raise SystemExit(1)
         print("\n✅ All edge case tests completed!")
 
+    async def main():
+        try:
+            await run_edge_case_tests()
+        finally:
+            await close_client()
+            await close_aiohttp_session()
+
     # Run the edge case tests
-    asyncio.run(run_edge_case_tests()) 
\ No newline at end of file
+    asyncio.run(main())